@@ -0,0 +1,92 @@
+# Benchmark suite: binary_gap (string walk) vs binary_gap_fast / binary_gap_bulk
+# Please install NumPy first: `pip3 install numpy`
+# Usage: python binary_gap_benchmark.py [--max-exp 8] [--reference-limit 1000000] [--dtype uint32]
+import argparse
+import time
+
+import numpy as np
+
+from binary_gap_5734 import binary_gap
+from binary_gap_bulk import binary_gap_bulk, binary_gap_fast
+
+
+def best_of(func, repeat):
+    """Run func `repeat` times and return (best wall time in seconds, last result)."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_benchmark(max_exp=8, reference_limit=10**6, dtype="uint32", repeat=3, seed=0):
+    """
+    Time every implementation for 1, 10, ..., 10**max_exp elements.
+
+    The per-element Python implementations are only timed up to
+    reference_limit elements (10**8 string walks take minutes); above that
+    the bulk result is checked against binary_gap on a random sample.
+    """
+    rng = np.random.default_rng(seed)
+    info = np.iinfo(dtype)
+    print(f"dtype={dtype}  repeat={repeat}  reference_limit={reference_limit}")
+    print(f"{'elements':>12} | {'binary_gap':>12} | {'bit trick':>12} | {'bulk':>12} | {'speedup':>9}")
+    print("-" * 70)
+
+    for exp in range(max_exp + 1):
+        size = 10**exp
+        values = rng.integers(1, info.max, size=size, dtype=dtype, endpoint=True)
+        values[0] = min(2147483647, info.max)
+
+        bulk_time, bulk_result = best_of(lambda: binary_gap_bulk(values), repeat)
+
+        if size <= reference_limit:
+            as_ints = values.tolist()
+            ref_time, ref_result = best_of(lambda: [binary_gap(n) for n in as_ints], repeat)
+            fast_time, fast_result = best_of(lambda: [binary_gap_fast(n) for n in as_ints], repeat)
+            if bulk_result.tolist() != ref_result or fast_result != ref_result:
+                raise AssertionError(f"Result mismatch for {size} elements")
+            speedup = f"{ref_time / bulk_time:8.1f}x"
+            ref_col, fast_col = f"{ref_time:11.4f}s", f"{fast_time:11.4f}s"
+        else:
+            sample = rng.choice(size, size=min(size, 10**4), replace=False)
+            if bulk_result[sample].tolist() != [binary_gap(int(n)) for n in values[sample]]:
+                raise AssertionError(f"Result mismatch for {size} elements")
+            speedup = ref_col = fast_col = "skipped"
+
+        print(f"{size:>12} | {ref_col:>12} | {fast_col:>12} | {bulk_time:11.4f}s | {speedup:>9}")
+
+
+def run_big_int_benchmark(repeat=3, seed=0):
+    """Compare binary_gap and binary_gap_fast on single very large Python ints."""
+    rng = np.random.default_rng(seed)
+    print(f"\n{'bits':>12} | {'binary_gap':>12} | {'bit trick':>12} | {'speedup':>9}")
+    print("-" * 55)
+    for exp in range(3, 7):
+        bits = 10**exp
+        # Sparse bits so the zero runs are long, like real "big gap" inputs.
+        positions = rng.choice(bits, size=max(2, bits // 64), replace=False)
+        n = sum(1 << int(p) for p in positions)
+        ref_time, ref_result = best_of(lambda: binary_gap(n), repeat)
+        fast_time, fast_result = best_of(lambda: binary_gap_fast(n), repeat)
+        if fast_result != ref_result:
+            raise AssertionError(f"Result mismatch for a {bits}-bit integer")
+        print(f"{bits:>12} | {ref_time:11.4f}s | {fast_time:11.4f}s | {ref_time / fast_time:8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark binary_gap implementations.")
+    parser.add_argument("--max-exp", type=int, default=8, help="largest input is 10**max_exp elements")
+    parser.add_argument("--reference-limit", type=int, default=10**6,
+                        help="largest input timed with the per-element implementations")
+    parser.add_argument("--dtype", choices=["uint32", "uint64"], default="uint32")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run_benchmark(args.max_exp, args.reference_limit, args.dtype, args.repeat)
+    run_big_int_benchmark(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# Bulk / vectorized variants of binary_gap from binary_gap_5734.py
+# Please install NumPy first: `pip3 install numpy`
+import numpy as np
+
+from binary_gap_5734 import binary_gap
+
+
+def _binary_gap_word(n):
+    """binary_gap of a positive int, jumping between bit runs with bit tricks."""
+    # Drop trailing zeros: they are not enclosed by ones.
+    n >>= (n & -n).bit_length() - 1
+
+    max_gap = 0
+    while True:
+        # Drop the run of trailing ones.
+        n >>= (n ^ (n + 1)).bit_length() - 1
+        if n == 0:
+            return max_gap
+        # The next run of zeros is always closed by a higher one.
+        gap = (n & -n).bit_length() - 1
+        if gap > max_gap:
+            max_gap = gap
+        n >>= gap
+
+
+# Per-byte lookup tables used by binary_gap_fast for big ints.
+_BYTE_TRAILING_ZEROS = [8] + [(b & -b).bit_length() - 1 for b in range(1, 256)]
+_BYTE_LEADING_ZEROS = [8 - b.bit_length() for b in range(256)]
+_BYTE_INNER_GAP = [0] + [_binary_gap_word(b) for b in range(1, 256)]
+
+
+def binary_gap_fast(n):
+    """
+    Bit-trick scalar version of binary_gap, suitable for big Python ints.
+
+    Machine-sized values jump from one run of bits to the next with
+    lowest-set-bit tricks. Larger values are scanned byte by byte with lookup
+    tables, which keeps the cost linear in the number of bits (shifting a big
+    int once per run would be quadratic).
+
+    Args:
+        n (int): An integer (negative values are treated like binary_gap does,
+            i.e. by their magnitude)
+
+    Returns:
+        int: The length of the longest binary gap (0 if no gap exists)
+    """
+    n = abs(n)
+    if n == 0:
+        return 0
+    if n.bit_length() <= 64:
+        return _binary_gap_word(n)
+
+    max_gap = 0
+    open_gap = -1  # zeros seen since the last one, -1 before the first one
+    for byte in n.to_bytes((n.bit_length() + 7) // 8, "little"):
+        if byte == 0:
+            if open_gap >= 0:
+                open_gap += 8
+            continue
+        if open_gap >= 0:
+            gap = open_gap + _BYTE_TRAILING_ZEROS[byte]
+            if gap > max_gap:
+                max_gap = gap
+        gap = _BYTE_INNER_GAP[byte]
+        if gap > max_gap:
+            max_gap = gap
+        open_gap = _BYTE_LEADING_ZEROS[byte]
+    return max_gap
+
+
+def _as_unsigned_array(values):
+    """Convert a NumPy array or any integer buffer into an unsigned array."""
+    if isinstance(values, (bytes, bytearray, memoryview)):
+        arr = np.asarray(memoryview(values))
+    else:
+        arr = np.asarray(values)
+    if arr.dtype.kind == "u":
+        return arr
+    if arr.dtype.kind == "i":
+        # abs() of the most negative value wraps around, but reinterpreting it
+        # as unsigned still yields the right magnitude (e.g. 2**63).
+        return np.abs(arr).view(arr.dtype.str.replace("i", "u"))
+    if arr.size == 0:
+        return np.asarray(arr, dtype=np.uint64)
+    raise TypeError(f"binary_gap_bulk expects integer input, got dtype {arr.dtype}")
+
+
+def binary_gap_bulk(values):
+    """
+    Compute binary_gap for every element of an integer array at once.
+
+    All work is done with vectorized bit operations on the array, without any
+    per-element string allocation.
+
+    Args:
+        values: A NumPy array or any buffer of uint32/uint64 (other integer
+            widths and signed arrays are accepted as well)
+
+    Returns:
+        numpy.ndarray: The binary gap of each element, with the input's shape
+    """
+    x = _as_unsigned_array(values)
+    shape = x.shape
+    # Work on a 1-d view: for 0-d input, z != 0 below would be a NumPy scalar,
+    # which cannot be reused as an out= buffer.
+    x = x.reshape(-1)
+    dtype = x.dtype.type
+    bits = x.dtype.itemsize * 8
+    one = dtype(1)
+
+    # Smear the highest set bit downwards: every bit up to it becomes 1.
+    high_mask = x.copy()
+    shift = 1
+    while shift < bits:
+        high_mask |= high_mask >> dtype(shift)
+        shift *= 2
+    # Every bit from the lowest set bit upwards (0 when x == 0).
+    low_bit = x & (~x + one)
+    low_mask = ~(low_bit - one)
+
+    # The gaps are the runs of ones in the inverted bits between the lowest and
+    # highest set bit. Each z &= z >> 1 step shortens every run by one, so the
+    # number of steps a value survives is the length of its longest run.
+    z = ~x
+    z &= high_mask
+    z &= low_mask
+    gaps = np.zeros(x.shape, dtype=np.uint8)
+    nonzero = z != 0
+    while nonzero.any():
+        gaps += nonzero
+        z &= z >> one
+        np.not_equal(z, 0, out=nonzero)
+    return gaps.astype(np.int64).reshape(shape)
+
+
+def main():
+    """Check the bulk and bit-trick versions against binary_gap."""
+    test_cases = [1, 2, 5, 6, 9, 15, 20, 22, 32, 1041, 529, 328, 2147483647]
+    expected = [binary_gap(n) for n in test_cases]
+
+    print("Bulk uint32:", binary_gap_bulk(np.array(test_cases, dtype=np.uint32)).tolist())
+    print("Bulk uint64:", binary_gap_bulk(np.array(test_cases, dtype=np.uint64)).tolist())
+    print("Bit trick:  ", [binary_gap_fast(n) for n in test_cases])
+    print("Expected:   ", expected)
+
+    big = (1 << 1000) | (1 << 10) | 1
+    print(f"Big int gap: {binary_gap_fast(big)} (expected {binary_gap(big)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,20 @@
 
-from langchain_deepseek import ChatDeepSeek
 from dotenv import load_dotenv
 import random
 import re
 from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # repo root, for the shared `common` package
+from common.llm import make_deepseek_llm
 
 
 load_dotenv()
 
-llm = ChatDeepSeek(
-    model="deepseek-chat",
-    temperature=0.2,
-    max_tokens=None,
-    timeout=None,
-    max_retries=2,
-    # other params...
-)
+# Count prompt tokens before dispatch; oversized prompts (e.g. long previous
+# code or feedback) get their middle cut out instead of failing at the API.
+llm = make_deepseek_llm(temperature=0.2, instrumented=True,
+                        max_prompt_tokens=32000, budget_policy="truncate_middle")
 
 def generate_prompt(use_case: str, goals: list[str], previous_code: str = "", feedback: str = "" ) -> str:
     print("📝 Constructing prompt for code generation...")
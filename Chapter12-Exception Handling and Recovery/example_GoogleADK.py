@@ -1,4 +1,142 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
 from google.adk.agents import Agent, SequentialAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.tools import ToolContext
+from google.genai import types
+
+from hedging import LatencyTracker, hedged_call
+from location_service import LocationServiceError, location_service
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # repo root, for the shared `common` package
+from common.resilience import OPEN, CircuitBreaker, RetryPolicy, get_resilience
+
+# Seconds a single precise lookup attempt may take before it counts as failed.
+PRIMARY_TIMEOUT = 2.0
+
+# Process-wide circuit breakers: once the precise-location backend keeps
+# failing, every request skips it and goes straight to the fallback.
+precise_resilience = get_resilience(
+    "precise_location",
+    breaker=CircuitBreaker("precise_location", failure_threshold=5, reset_timeout=30.0),
+    # Only backend errors are retried: a timed-out attempt has already used
+    # PRIMARY_TIMEOUT, and retrying it would double the wait for the fallback.
+    policy=RetryPolicy(max_attempts=2, base_delay=0.1, retry_on=(LocationServiceError,)),
+)
+general_resilience = get_resilience("general_area")
+
+# Hedged mode: start the fallback lookup if the primary has not answered after
+# LOCATION_HEDGE_DELAY seconds (e.g. "0.3"), or at a percentile of recent
+# primary latencies (e.g. "p95"). Unset keeps the sequential behaviour.
+LOCATION_HEDGE_DELAY = os.getenv("LOCATION_HEDGE_DELAY")
+
+primary_latency_tracker = LatencyTracker(percentile=95.0)
+hedge_delay: float | None = None  # fixed delay in seconds; None = use the tracker
+if LOCATION_HEDGE_DELAY:
+    try:
+        if LOCATION_HEDGE_DELAY.startswith("p"):
+            primary_latency_tracker.percentile = float(LOCATION_HEDGE_DELAY[1:])
+            valid = 0 < primary_latency_tracker.percentile <= 100
+        else:
+            hedge_delay = float(LOCATION_HEDGE_DELAY)
+            valid = hedge_delay >= 0
+    except ValueError:
+        valid = False
+    if not valid:
+        raise ValueError(f"LOCATION_HEDGE_DELAY must be seconds (e.g. '0.3') or a percentile "
+                         f"(e.g. 'p95'), got {LOCATION_HEDGE_DELAY!r}")
+
+
+async def _precise_attempt(address: str) -> dict:
+    return await asyncio.wait_for(location_service.lookup_precise(address), PRIMARY_TIMEOUT)
+
+
+async def _precise_lookup(address: str) -> dict:
+    try:
+        info = await precise_resilience.acall(_precise_attempt, address)
+    except Exception as e:
+        return {"status": "error", "error_message": str(e)}
+    return {"status": "success", "location": info}
+
+
+async def _general_lookup(city: str) -> dict:
+    try:
+        info = await general_resilience.acall(location_service.lookup_general_area, city)
+    except Exception as e:
+        return {"status": "error", "error_message": str(e)}
+    return {"status": "success", "location": info}
+
+
+def _record_result(tool_context: ToolContext, result: dict, primary_failed: bool | None = None) -> dict:
+    """Write a lookup result to the state keys fallback_handler and response_agent read."""
+    if primary_failed is not None:
+        tool_context.state["primary_location_failed"] = primary_failed
+    if result["status"] == "success":
+        tool_context.state["location_result"] = result["location"]
+    return result
+
+
+async def get_precise_location_info(address: str, tool_context: ToolContext) -> dict:
+    """Looks up the precise location (coordinates) of a full street address.
+
+    Args:
+        address: The full address provided by the user.
+
+    Returns:
+        dict: status and the location, or an error message.
+    """
+    result = await _precise_lookup(address)
+    return _record_result(tool_context, result, primary_failed=result["status"] != "success")
+
+
+async def get_general_area_info(city: str, tool_context: ToolContext) -> dict:
+    """Looks up general, city-level information when no precise location is available.
+
+    Args:
+        city: The city mentioned in the user's query.
+
+    Returns:
+        dict: status and the location, or an error message.
+    """
+    return _record_result(tool_context, await _general_lookup(city))
+
+
+async def get_location_info_hedged(address: str, city: str, tool_context: ToolContext) -> dict:
+    """Looks up a location, preferring the precise address but falling back to the city.
+
+    Args:
+        address: The full address provided by the user.
+        city: The city mentioned in the user's query.
+
+    Returns:
+        dict: status and the best location found, or an error message.
+    """
+    if precise_resilience.breaker.state == OPEN:
+        # Circuit open: do not even start the primary.
+        return _record_result(tool_context, await _general_lookup(city), primary_failed=True)
+
+    outcome = await hedged_call(
+        lambda: _precise_lookup(address),
+        lambda: _general_lookup(city),
+        hedge_delay=hedge_delay,
+        tracker=primary_latency_tracker,
+    )
+    return _record_result(tool_context, outcome.value, primary_failed=outcome.source != "primary")
+
+
+def skip_primary_if_circuit_open(callback_context: CallbackContext) -> types.Content | None:
+    """Skips primary_handler (and its model turn) while the precise-location circuit is open."""
+    if precise_resilience.breaker.state != OPEN:
+        return None
+    callback_context.state["primary_location_failed"] = True
+    return types.Content(
+        role="model",
+        parts=[types.Part(text="Precise location service unavailable (circuit open); using fallback.")],
+    )
+
 
 # Agent 1: Tries the primary tool. Its focus is narrow and clear.
 primary_handler = Agent(
@@ -9,7 +147,8 @@ primary_handler = Agent(
         Use the get_precise_location_info tool with the user's provided
         address.
     """,
-    tools=[get_precise_location_info]
+    tools=[get_precise_location_info],
+    before_agent_callback=skip_primary_if_circuit_open,
 )
 
 # Agent 2: Acts as the fallback handler, checking state to decide its action.
@@ -26,6 +165,20 @@ fallback_handler = Agent(
     tools=[get_general_area_info]
 )
 
+# Hedged alternative to Agents 1 and 2: a single handler races the precise and
+# general lookups in one tool call, so the fallback no longer waits for the
+# primary to time out.
+hedged_handler = Agent(
+    name="hedged_handler",
+    model="gemini-2.0-flash-exp",
+    instruction="""
+        Your job is to get location information.
+        Use the get_location_info_hedged tool with the user's provided
+        address and the city extracted from the user's query.
+    """,
+    tools=[get_location_info_hedged]
+)
+
 # Agent 3: Presents the final result from the state.
 response_agent = Agent(
     name="response_agent",
@@ -40,7 +193,13 @@ response_agent = Agent(
 )
 
 # The SequentialAgent ensures the handlers run in a guaranteed order.
-robust_location_agent = SequentialAgent(
-    name="robust_location_agent",
-    sub_agents=[primary_handler, fallback_handler, response_agent]
-)
+if LOCATION_HEDGE_DELAY:
+    robust_location_agent = SequentialAgent(
+        name="robust_location_agent",
+        sub_agents=[hedged_handler, response_agent]
+    )
+else:
+    robust_location_agent = SequentialAgent(
+        name="robust_location_agent",
+        sub_agents=[primary_handler, fallback_handler, response_agent]
+    )
@@ -0,0 +1,134 @@
+# Hedged primary/fallback execution.
+# Instead of waiting for the primary to fail completely before starting the
+# fallback, the fallback is started once the primary is "late" (after a fixed
+# delay or a latency-percentile deadline). Whichever acceptable result arrives
+# first wins and the other call is cancelled.
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+
+class LatencyTracker:
+    """
+    Sliding window of observed primary latencies.
+
+    Used to derive a percentile deadline (e.g. "hedge once the primary is
+    slower than 95% of its recent calls").
+    """
+
+    def __init__(self, window: int = 200, percentile: float = 95.0,
+                 default_delay: float = 0.5, min_samples: int = 20):
+        self.samples = deque(maxlen=window)
+        self.percentile = percentile
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+
+    def record(self, latency: float) -> None:
+        self.samples.append(latency)
+
+    def deadline(self) -> float:
+        """Current hedge delay: the configured percentile of recent latencies."""
+        if len(self.samples) < self.min_samples:
+            return self.default_delay
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return ordered[index]
+
+
+@dataclass
+class HedgedResult:
+    """Outcome of a hedged call: the value, which side produced it and timings."""
+    value: Any
+    source: str          # "primary" or "fallback"
+    hedged: bool         # whether the fallback was started at all
+    latency: float
+
+
+def _default_acceptable(value: Any) -> bool:
+    # Tool results in this chapter are dicts with a "status" key.
+    if isinstance(value, dict) and "status" in value:
+        return value["status"] == "success"
+    return value is not None
+
+
+async def hedged_call(
+    primary: Callable[[], Awaitable[Any]],
+    fallback: Callable[[], Awaitable[Any]],
+    hedge_delay: float | None = None,
+    tracker: LatencyTracker | None = None,
+    is_acceptable: Callable[[Any], bool] = _default_acceptable,
+) -> HedgedResult:
+    """
+    Run primary, and start fallback if primary has not answered in time.
+
+    Args:
+        primary: Zero-argument coroutine factory for the preferred call.
+        fallback: Zero-argument coroutine factory for the degraded call.
+        hedge_delay: Seconds to wait for primary before also starting fallback.
+            If None, tracker.deadline() is used.
+        tracker: Optional LatencyTracker; primary latencies (or, for a
+            cancelled primary, the time it had run so far) are recorded.
+        is_acceptable: Decides whether a returned value counts as a success.
+
+    Returns:
+        HedgedResult for the first acceptable result.
+
+    If neither call produces an acceptable result, the last unacceptable value
+    is returned (source "fallback"), or the last error is re-raised if both
+    calls raised.
+    """
+    if hedge_delay is None:
+        hedge_delay = tracker.deadline() if tracker else 0.0
+
+    start = time.perf_counter()
+    tasks = {asyncio.ensure_future(primary()): "primary"}
+    hedged = False
+    last_error: BaseException | None = None
+    last_value: Any = None
+
+    def start_fallback():
+        nonlocal hedged
+        if not hedged:
+            hedged = True
+            tasks[asyncio.ensure_future(fallback())] = "fallback"
+
+    try:
+        timeout = hedge_delay
+        while tasks:
+            done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            timeout = None
+            if not done:
+                # Primary is late: hedge.
+                start_fallback()
+                continue
+            for task in done:
+                source = tasks.pop(task)
+                try:
+                    value = task.result()
+                except Exception as e:
+                    last_error = e
+                    value = None
+                else:
+                    last_value = value
+                    if is_acceptable(value):
+                        latency = time.perf_counter() - start
+                        if source == "primary" and tracker is not None:
+                            tracker.record(latency)
+                        return HedgedResult(value, source, hedged, latency)
+                if source == "primary":
+                    # Primary failed outright: no point waiting for the deadline.
+                    start_fallback()
+    finally:
+        # Cancel the loser (or both, if we are being cancelled ourselves).
+        for task, source in tasks.items():
+            task.cancel()
+            if source == "primary" and tracker is not None:
+                # A cancelled primary took at least this long; recording the
+                # lower bound keeps the percentile from ratcheting downwards.
+                tracker.record(time.perf_counter() - start)
+
+    if last_value is None and last_error is not None:
+        raise last_error
+    return HedgedResult(last_value, "fallback", hedged, time.perf_counter() - start)
@@ -0,0 +1,98 @@
+# Measures end-to-end lookup latency of the sequential primary -> fallback
+# strategy against hedged execution, using the stub location service.
+# Usage: python hedging_benchmark.py [--requests 500] [--hedge-delay 0.15] [--percentile 95]
+import argparse
+import asyncio
+import time
+
+from hedging import LatencyTracker, hedged_call
+from location_service import StubEndpoint, StubLocationService
+
+
+async def sequential_lookup(service: StubLocationService, primary_timeout: float) -> str:
+    """The SequentialAgent behaviour: fallback only after the primary has failed."""
+    try:
+        await asyncio.wait_for(service.lookup_precise("1600 Amphitheatre Parkway"), primary_timeout)
+        return "primary"
+    except Exception:
+        await service.lookup_general_area("Mountain View")
+        return "fallback"
+
+
+async def hedged_lookup(service: StubLocationService, hedge_delay: float | None,
+                        tracker: LatencyTracker | None) -> str:
+    outcome = await hedged_call(
+        lambda: service.lookup_precise("1600 Amphitheatre Parkway"),
+        lambda: service.lookup_general_area("Mountain View"),
+        hedge_delay=hedge_delay,
+        tracker=tracker,
+    )
+    return outcome.source
+
+
+def percentile(ordered: list[float], pct: float) -> float:
+    index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+    return ordered[index]
+
+
+async def measure(name: str, lookup, requests: int, concurrency: int) -> None:
+    latencies = []
+    sources = {"primary": 0, "fallback": 0, "error": 0}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                source = await lookup()
+            except Exception:
+                source = "error"
+            latencies.append(time.perf_counter() - start)
+            sources[source] += 1
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    ordered = sorted(latencies)
+    print(f"{name:<22} | p50 {percentile(ordered, 50) * 1000:7.1f}ms"
+          f" | p99 {percentile(ordered, 99) * 1000:7.1f}ms"
+          f" | primary {sources['primary']:>5} | fallback {sources['fallback']:>5} | errors {sources['error']:>3}")
+
+
+def make_service(args, seed: int) -> StubLocationService:
+    return StubLocationService(
+        precise=StubEndpoint(base_latency=0.1, jitter=0.05, slow_rate=args.slow_rate,
+                             slow_latency=args.primary_timeout * 1.5, failure_rate=args.failure_rate),
+        general=StubEndpoint(base_latency=0.05, jitter=0.02),
+        seed=seed,
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare sequential and hedged location lookups.")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--primary-timeout", type=float, default=1.0)
+    parser.add_argument("--hedge-delay", type=float, default=0.15)
+    parser.add_argument("--percentile", type=float, default=95.0)
+    parser.add_argument("--slow-rate", type=float, default=0.05, help="share of primary calls that hang")
+    parser.add_argument("--failure-rate", type=float, default=0.1, help="share of primary calls that fail")
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests, primary slow_rate={args.slow_rate}, failure_rate={args.failure_rate}")
+    print("-" * 95)
+
+    service = make_service(args, seed=1)
+    await measure("sequential", lambda: sequential_lookup(service, args.primary_timeout),
+                  args.requests, args.concurrency)
+
+    service = make_service(args, seed=1)
+    await measure(f"hedged @ {args.hedge_delay}s", lambda: hedged_lookup(service, args.hedge_delay, None),
+                  args.requests, args.concurrency)
+
+    service = make_service(args, seed=1)
+    tracker = LatencyTracker(percentile=args.percentile, default_delay=args.hedge_delay)
+    await measure(f"hedged @ p{args.percentile:g}", lambda: hedged_lookup(service, None, tracker),
+                  args.requests, args.concurrency)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+# A local stub location service used by the Chapter 12 examples.
+# It stands in for the real precise-location and general-area backends, with
+# injectable latency and failures so recovery strategies can be measured.
+import asyncio
+import random
+import zlib
+from dataclasses import dataclass, field
+
+
+class LocationServiceError(Exception):
+    """Raised when a stub endpoint simulates a backend failure."""
+
+
+@dataclass
+class StubEndpoint:
+    """
+    Latency / failure profile of one stub endpoint.
+
+    Every call sleeps for base_latency plus a uniform jitter. With probability
+    slow_rate the call instead takes slow_latency (the "tail"), and with
+    probability failure_rate it raises LocationServiceError after sleeping.
+    """
+    base_latency: float = 0.1
+    jitter: float = 0.05
+    slow_rate: float = 0.0
+    slow_latency: float = 2.0
+    failure_rate: float = 0.0
+
+    def sample_latency(self, rng: random.Random) -> float:
+        if rng.random() < self.slow_rate:
+            return self.slow_latency
+        return self.base_latency + rng.uniform(0, self.jitter)
+
+
+@dataclass
+class StubLocationService:
+    """In-process stand-in for the precise and general location backends."""
+    precise: StubEndpoint = field(default_factory=lambda: StubEndpoint(slow_rate=0.05, failure_rate=0.1))
+    general: StubEndpoint = field(default_factory=lambda: StubEndpoint(base_latency=0.05, jitter=0.02))
+    seed: int | None = None
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+
+    async def _call(self, endpoint: StubEndpoint, name: str) -> None:
+        latency = endpoint.sample_latency(self._rng)
+        failed = self._rng.random() < endpoint.failure_rate
+        await asyncio.sleep(latency)
+        if failed:
+            raise LocationServiceError(f"{name} backend failed after {latency:.3f}s")
+
+    async def lookup_precise(self, address: str) -> dict:
+        """Resolve a full street address to coordinates."""
+        await self._call(self.precise, "precise location")
+        # Deterministic fake coordinates so repeated lookups agree.
+        h = zlib.crc32(address.strip().lower().encode())
+        return {
+            "address": address,
+            "latitude": round((h % 18000) / 100 - 90, 4),
+            "longitude": round((h // 18000 % 36000) / 100 - 180, 4),
+            "precision": "street",
+        }
+
+    async def lookup_general_area(self, city: str) -> dict:
+        """Return coarse information about a city."""
+        await self._call(self.general, "general area")
+        return {
+            "city": city,
+            "summary": f"{city} (city-level location, precise address unavailable)",
+            "precision": "city",
+        }
+
+
+# The service instance used by the agent tools; replace it to inject other
+# latency / failure profiles.
+location_service = StubLocationService()
@@ -2,15 +2,25 @@
 import os
 from openai import OpenAI
 from dotenv import load_dotenv
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # repo root, for the shared `common` package
+from common.http_resilience import resilient_http_clients
 
 load_dotenv()
 
 openai_api_key = os.getenv('DEEPSEEK_API_KEY')
 openai_base_url = os.getenv('DEEPSEEK_BASE_URL')
 
+# Shared circuit breaker + retry policy for every DeepSeek call in this process.
+http_client, _ = resilient_http_clients("deepseek")
+
 client = OpenAI(
     api_key=openai_api_key,
-    base_url=openai_base_url)
+    base_url=openai_base_url,
+    max_retries=0,  # retries are handled by the shared "deepseek" RetryPolicy
+    http_client=http_client)
 
 response = client.chat.completions.create(
     model="deepseek-chat",
@@ -0,0 +1,200 @@
+# Resumable streaming batch mode for the spec-extraction chain (full_chain).
+#
+# Usage:
+#   python batch_LangChain.py products.jsonl specs.jsonl --concurrency 16
+#   python batch_LangChain.py products.csv specs.jsonl --text-field description --ordered
+#
+# - Input is streamed row by row from JSONL or CSV, never loaded whole.
+# - Up to --concurrency rows run through the two-stage chain at once.
+# - Results are appended to the output JSONL as they finish (input order with
+#   --ordered).
+# - Processed row offsets are checkpointed to <output>.ckpt; re-running the
+#   same command after a crash skips rows that were already completed. Rows
+#   finished after the last checkpoint may be written twice (at-least-once),
+#   so deduplicate on "offset" if that matters.
+# - Rows whose chain call fails, and malformed rows (invalid JSON, not an
+#   object, missing --text-field), are written with an "error" field and
+#   count as processed; they are not retried on resume.
+import argparse
+import asyncio
+import csv
+import json
+import os
+import time
+from collections import deque
+from typing import Iterator
+
+
+def iter_records(path: str, text_field: str, skip=lambda offset: False) -> Iterator[tuple[int, dict]]:
+    """Yield (offset, record) for each row of a JSONL or CSV file, lazily.
+
+    The offset is the 0-based row number. Rows for which skip(offset) is true
+    are not yielded; JSONL rows are not even decoded, CSV rows are still read
+    by csv.DictReader. A JSONL line that is not valid JSON is yielded as its
+    json.JSONDecodeError instead of a record, so one bad line fails only
+    that row.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            for offset, row in enumerate(csv.DictReader(f)):
+                if not skip(offset):
+                    yield offset, row
+            return
+        offset = 0
+        for line in f:
+            if not line.strip():
+                continue
+            if not skip(offset):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    record = e
+                if isinstance(record, str):
+                    record = {text_field: record}
+                yield offset, record
+            offset += 1
+
+
+class Checkpoint:
+    """Processed row offsets: everything below `next_offset`, plus `done_above`.
+
+    Saved atomically (write + rename) so a crash never leaves a torn file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.next_offset = 0
+        self.done_above: set[int] = set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+            self.next_offset = state["next_offset"]
+            self.done_above = set(state["done_above"])
+
+    def is_done(self, offset: int) -> bool:
+        return offset < self.next_offset or offset in self.done_above
+
+    def mark_done(self, offset: int) -> None:
+        self.done_above.add(offset)
+        # Advance the low-water mark over any contiguous completed rows.
+        while self.next_offset in self.done_above:
+            self.done_above.remove(self.next_offset)
+            self.next_offset += 1
+
+    def save(self) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"next_offset": self.next_offset, "done_above": sorted(self.done_above)}, f)
+        os.replace(tmp, self.path)
+
+
+async def run_batch(chain, input_path: str, output_path: str, text_field: str = "text",
+                    concurrency: int = 8, ordered: bool = False, checkpoint_path: str | None = None,
+                    checkpoint_every: float = 5.0) -> dict:
+    """
+    Stream rows from input_path through chain and append results to output_path.
+
+    Args:
+        chain: A Runnable taking {"text_input": ...}, normally full_chain.
+        input_path: JSONL (one object, or string, per line) or .csv file.
+        output_path: JSONL file results are appended to.
+        text_field: Field of each record holding the product description.
+        concurrency: Maximum number of rows in flight.
+        ordered: Write results in input order instead of completion order.
+        checkpoint_path: Where processed offsets are stored (default
+            output_path + ".ckpt").
+        checkpoint_every: Seconds between checkpoint saves.
+
+    Returns:
+        dict: counts of processed, failed and skipped rows.
+    """
+    checkpoint = Checkpoint(checkpoint_path or output_path + ".ckpt")
+    stats = {"processed": 0, "failed": 0, "skipped": 0}
+
+    def skip(offset: int) -> bool:
+        if checkpoint.is_done(offset):
+            stats["skipped"] += 1
+            return True
+        return False
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    # Bounds rows that are queued, running or (in ordered mode) waiting for
+    # an earlier row, so memory stays flat however large the input is.
+    window = asyncio.Semaphore(concurrency * 4)
+    pending: dict[int, dict] = {}  # finished rows not yet written (ordered mode)
+    emit_order: deque[int] = deque()  # offsets in the order they were read
+    last_save = time.monotonic()
+
+    out = open(output_path, "a", encoding="utf-8")
+
+    def write(result: dict) -> None:
+        nonlocal last_save
+        out.write(json.dumps(result, ensure_ascii=False) + "\n")
+        checkpoint.mark_done(result["offset"])
+        window.release()
+        if time.monotonic() - last_save >= checkpoint_every:
+            out.flush()
+            checkpoint.save()
+            last_save = time.monotonic()
+
+    def finish(result: dict) -> None:
+        if not ordered:
+            write(result)
+            return
+        pending[result["offset"]] = result
+        while emit_order and emit_order[0] in pending:
+            write(pending.pop(emit_order.popleft()))
+
+    async def produce():
+        for offset, record in iter_records(input_path, text_field, skip):
+            await window.acquire()
+            if ordered:
+                emit_order.append(offset)
+            await queue.put((offset, record))
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def work():
+        while (item := await queue.get()) is not None:
+            offset, record = item
+            result = {"offset": offset, "id": None}
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                if not isinstance(record, dict):
+                    raise TypeError(f"expected a JSON object, got {type(record).__name__}")
+                result["id"] = record.get("id")
+                result["result"] = await chain.ainvoke({"text_input": record[text_field]})
+                stats["processed"] += 1
+            except Exception as e:
+                result["error"] = f"{type(e).__name__}: {e}"
+                stats["failed"] += 1
+            finish(result)
+
+    try:
+        await asyncio.gather(produce(), *(work() for _ in range(concurrency)))
+    finally:
+        out.close()
+        checkpoint.save()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the spec-extraction chain over a JSONL/CSV file.")
+    parser.add_argument("input", help="JSONL or CSV file with product descriptions")
+    parser.add_argument("output", help="JSONL file to append results to")
+    parser.add_argument("--text-field", default="text", help="field holding the description")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--ordered", action="store_true", help="write results in input order")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <output>.ckpt)")
+    args = parser.parse_args()
+
+    from example_LangChain import full_chain
+
+    stats = asyncio.run(run_batch(full_chain, args.input, args.output, args.text_field,
+                                  args.concurrency, args.ordered, args.checkpoint))
+    print(f"processed={stats['processed']} failed={stats['failed']} skipped (already done)={stats['skipped']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,19 +3,17 @@ from langchain_core.prompts import PromptTemplate
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
-from langchain_deepseek import ChatDeepSeek
 from dotenv import load_dotenv
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # repo root, for the shared `common` package
+from common.llm import make_deepseek_llm
+from common.instrumentation import instrument
 
 load_dotenv()
 
-llm = ChatDeepSeek(
-    model="deepseek-chat",
-    temperature=0,
-    max_tokens=None,
-    timeout=None,
-    max_retries=2,
-    # other params...
-)
+llm = make_deepseek_llm(temperature=0)
 
 # messages = [
 #     (
@@ -48,10 +46,14 @@ full_chain = (
     | llm
     | StrOutputParser()
 )
+# Record latency / tokens / TTFT of every model call in the chain.
+full_chain = instrument(full_chain)
 # --- Run the Chain ---
-input_text = "The new laptop model features a 3.5 GHz octa-coreprocessor, 16GB of RAM, and a 1TB NVMe SSD."
-# Execute the chain with the input text dictionary.
-final_result = full_chain.invoke({"text_input": input_text})
-print(final_result)
-print("\n--- Final JSON Output ---")
+# (For many inputs from a JSONL/CSV file, see batch_LangChain.py.)
+if __name__ == "__main__":
+    input_text = "The new laptop model features a 3.5 GHz octa-coreprocessor, 16GB of RAM, and a 1TB NVMe SSD."
+    # Execute the chain with the input text dictionary.
+    final_result = full_chain.invoke({"text_input": input_text})
+    print(final_result)
+    print("\n--- Final JSON Output ---")
 
@@ -1,24 +1,24 @@
+import asyncio
 import os
 from langchain_core.prompts import PromptTemplate
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnablePassthrough, RunnableBranch
+from langchain_core.runnables import RunnablePassthrough
 
-from langchain_deepseek import ChatDeepSeek
 from dotenv import load_dotenv
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # repo root, for the shared `common` package
+from common.llm import make_deepseek_llm
+from common.instrumentation import instrument
+from common.routing import DispatchRouter
 
 load_dotenv()
 
-llm = ChatDeepSeek(
-    model="deepseek-chat",
-    temperature=0,
-    max_tokens=None,
-    timeout=None,
-    max_retries=2,
-    # other params...
-)
+llm = make_deepseek_llm(temperature=0)
 
-def booking_handler(request:str)->str:
+async def booking_handler(request:str)->str:
     """
     模拟预订Agent处理请求。
 
@@ -31,7 +31,7 @@ def booking_handler(request:str)->str:
     print("\n---将请求委托给预订Agent处理程序---")
     return f"预订Agent处理了请求: {request}。结果：模拟的预订操作。"
 
-def info_handler(request:str)->str:
+async def info_handler(request:str)->str:
     """
     模拟信息Agent处理请求。
 
@@ -44,7 +44,7 @@ def info_handler(request:str)->str:
     print("\n---将请求委托给信息Agent处理程序---")
     return f"信息Agent处理了请求: {request}。结果：模拟的信息检索结果。"
 
-def unclear_handler(request:str)->str:
+async def unclear_handler(request:str)->str:
     """
     模拟不清晰Agent处理请求。
 
@@ -71,32 +71,33 @@ if llm :
     coordinator_router_chain = coordinator_router_prompt | llm | StrOutputParser()
 
 # 基于子Agent进行路由处理
-# 使用 RunnableBranch 根据路由器链的输出结果来决定路由路径。
-# 为 RunnableBranch 定义不同的路由分支：
+# 使用 DispatchRouter 根据路由器链的输出结果来决定路由路径：
+# 路由标签（strip().lower() 之后）直接在字典中查找处理程序，O(1) 分发，路由再多也不会变慢；
+# 处理程序的返回值即为输出，不再通过 RunnablePassthrough.assign 复制中间字典。
 # 说明：为避免出现 x["request"]["request"] 的双层访问混淆，这里将并行映射中的“保留原始输入”键统一为 raw。
-branches = {
-    "booker": RunnablePassthrough.assign(output=lambda x: booking_handler(x["raw"]["request"])),
-    "info": RunnablePassthrough.assign(output=lambda x: info_handler(x["raw"]["request"])),
-    "unclear": RunnablePassthrough.assign(output=lambda x: unclear_handler(x["raw"]["request"]))
+handlers = {
+    "booker": booking_handler,
+    "info": info_handler,
 }
 
-#创建RunnableBranch类型。该类型会接收路由器链的处理结果，然后将原始输入数据传递给对应的分支。
-delegation_branch = RunnableBranch(
-    # 路由条件按顺序匹配，第一个命中的分支会被执行；增加 lower() 提升健壮性但不改变现有逻辑
-    (lambda x: x["decision"].strip().lower() == "booker", branches["booker"]),
-    (lambda x: x["decision"].strip().lower() == "info", branches["info"]),
-    branches["unclear"]  # 用于处理 “unclear” 类型的输出，或任何其他无法明确分类的输出
+delegation_router = DispatchRouter(
+    handlers,
+    default=unclear_handler,  # 用于处理 “unclear” 类型的输出，或任何其他无法明确分类的输出
+    label=lambda x: x["decision"],
+    argument=lambda x: x["raw"]["request"],
 )
 
-# 将路由器链和委托分支合并为一个可执行的整体
-# 路由器链的输出结果会与原始数据一起被传递给委托分支。
+# 将路由器链和委托路由合并为一个可执行的整体
+# 路由器链的输出结果会与原始数据一起被传递给委托路由。
 # 说明：并行映射中使用 raw 键原样保存“原始输入”，以提升可读性和维护性。
 coordinator_agent = {
     "decision": coordinator_router_chain,
     "raw": RunnablePassthrough(),
-} | delegation_branch | (lambda x: x["output"])
+} | delegation_router
+# 记录每次模型调用的耗时、token 用量和首 token 时间
+coordinator_agent = instrument(coordinator_agent)
 
-def main():
+async def main():
     """
     示例主函数：
     - 展示基于 LCEL 的路由协调器如何将不同意图请求路由到对应的处理器。
@@ -112,18 +113,18 @@ def main():
 
     print("正在处理预订请求")
     request_a = "我想预订一个航班到纽约"
-    response_a = coordinator_agent.invoke({"request": request_a})
+    response_a = await coordinator_agent.ainvoke({"request": request_a})
     print(response_a)
 
     print("正在处理信息请求")
     request_b = "纽约的天气怎么样"
-    response_b = coordinator_agent.invoke({"request": request_b})
+    response_b = await coordinator_agent.ainvoke({"request": request_b})
     print(response_b)
 
     print("正在处理不清晰请求")
     request_c = "你好"
-    response_c = coordinator_agent.invoke({"request": request_c})
+    response_c = await coordinator_agent.ainvoke({"request": request_c})
     print(response_c)
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
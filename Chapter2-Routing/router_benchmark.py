@@ -0,0 +1,84 @@
+# Measures the per-request routing overhead of the RunnableBranch composition
+# used before (one lambda condition per route + RunnablePassthrough.assign +
+# output extraction) against DispatchRouter, for a growing number of routes.
+# The router decision is given directly, so no model is called.
+# Usage: python router_benchmark.py [--routes 3 30 300] [--requests 2000]
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from langchain_core.runnables import RunnableBranch, RunnablePassthrough
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # repo root, for the shared `common` package
+from common.routing import DispatchRouter
+
+
+def handler(request: str) -> str:
+    return f"handled: {request}"
+
+
+async def async_handler(request: str) -> str:
+    return f"handled: {request}"
+
+
+def make_branch(labels: list[str]):
+    """The composition from example_LangChain.py, generalised to len(labels) routes."""
+    def route(label):
+        return (lambda x: x["decision"].strip().lower() == label,
+                RunnablePassthrough.assign(output=lambda x: handler(x["raw"]["request"])))
+
+    default = RunnablePassthrough.assign(output=lambda x: handler(x["raw"]["request"]))
+    return RunnableBranch(*(route(label) for label in labels), default) | (lambda x: x["output"])
+
+
+def make_router(labels: list[str], fn) -> DispatchRouter:
+    return DispatchRouter({label: fn for label in labels}, default=fn,
+                          label=lambda x: x["decision"], argument=lambda x: x["raw"]["request"])
+
+
+def make_inputs(labels: list[str], requests: int) -> list[dict]:
+    # Cycle through every label, so the branch checks len(labels) / 2 conditions on average.
+    return [{"decision": labels[i % len(labels)], "raw": {"request": f"request {i}"}} for i in range(requests)]
+
+
+def time_invoke(runnable, inputs: list[dict]) -> float:
+    start = time.perf_counter()
+    for payload in inputs:
+        runnable.invoke(payload)
+    return (time.perf_counter() - start) / len(inputs)
+
+
+async def time_ainvoke(runnable, inputs: list[dict]) -> float:
+    start = time.perf_counter()
+    for payload in inputs:
+        await runnable.ainvoke(payload)
+    return (time.perf_counter() - start) / len(inputs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RunnableBranch against DispatchRouter.")
+    parser.add_argument("--routes", type=int, nargs="+", default=[3, 30, 300])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'routes':>6}  {'implementation':<28}{'invoke':>12}{'ainvoke':>12}")
+    for n_routes in args.routes:
+        labels = [f"route_{i}" for i in range(n_routes)]
+        inputs = make_inputs(labels, args.requests)
+        candidates = [
+            ("RunnableBranch", make_branch(labels), True),
+            ("DispatchRouter (sync)", make_router(labels, handler), True),
+            # invoke on an async handler starts an event loop per call; not a fair comparison.
+            ("DispatchRouter (async)", make_router(labels, async_handler), False),
+        ]
+        for name, runnable, sync in candidates:
+            asyncio.run(runnable.ainvoke(inputs[0]))  # warm-up
+            sync_us = f"{time_invoke(runnable, inputs) * 1e6:9.1f} us" if sync else f"{'-':>12}"
+            async_us = asyncio.run(time_ainvoke(runnable, inputs)) * 1e6
+            print(f"{n_routes:>6}  {name:<28}{sync_us:>12}{async_us:9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
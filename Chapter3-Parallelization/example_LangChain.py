@@ -6,19 +6,17 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import Runnable, RunnablePassthrough, RunnableParallel, RunnableBranch
 
-from langchain_deepseek import ChatDeepSeek
 from dotenv import load_dotenv
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # repo root, for the shared `common` package
+from common.llm import make_deepseek_llm
+from common.instrumentation import instrument
 
 load_dotenv()
 
-llm = ChatDeepSeek(
-    model="deepseek-chat",
-    temperature=0,
-    max_tokens=None,
-    timeout=None,
-    max_retries=2,
-    # other params...
-)
+llm = make_deepseek_llm(temperature=0)
 
 summarize_chain: Runnable = (
     ChatPromptTemplate.from_messages([
@@ -70,6 +68,8 @@ synthesis_prompt = ChatPromptTemplate.from_messages([
 
 # 3.将并行处理和合成提示语连接起来
 full_parallel_chain = map_chain | synthesis_prompt | llm | StrOutputParser()
+# 记录每次模型调用的耗时、token 用量和首 token 时间
+full_parallel_chain = instrument(full_parallel_chain)
 
 # 运行并行处理链
 async def run_parallel_example(topic: str) -> None:
@@ -4,19 +4,17 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain.agents import create_agent
 from langchain.tools import tool
 
-from langchain_deepseek import ChatDeepSeek
 from dotenv import load_dotenv
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # repo root, for the shared `common` package
+from common.llm import make_deepseek_llm
+from common.instrumentation import instrument
 
 load_dotenv()
 
-llm = ChatDeepSeek(
-    model="deepseek-chat",
-    temperature=0,
-    max_tokens=None,
-    timeout=None,
-    max_retries=2,
-    # other params...
-)
+llm = make_deepseek_llm(temperature=0)
 
 @tool
 def search_information(query: str) -> str:
@@ -41,6 +39,8 @@ if llm:
         ("placeholder", "{agent_scratchpad}"),
     ])
     agent = create_agent(llm, tools, system_prompt="You are a helpful assistant. Be concise and accurate.")
+    # Record latency / tokens / TTFT of every model call the agent makes.
+    agent = instrument(agent)
 else:
     agent_executor = None
 
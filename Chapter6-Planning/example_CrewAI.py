@@ -3,6 +3,12 @@ import os
 from crewai import Agent, Task, Crew, Process, LLM
 from dotenv import load_dotenv
 
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # repo root, for the shared `common` package
+from common.crew_dag import run_crew_dag
+
 load_dotenv()
 
 llm = LLM(
@@ -47,6 +53,12 @@ crew = Crew(
     process=Process.sequential,
 )
 
-result = crew.kickoff()
-print(result)
+# CREW_PROCESS=dag 时按任务的 context 依赖并发执行互不依赖的任务，并打印关键路径
+if os.getenv("CREW_PROCESS") == "dag":
+    result = run_crew_dag(crew, max_workers=4)
+    print(result.raw)
+    print(result.critical_path_report())
+else:
+    result = crew.kickoff()
+    print(result)
 
@@ -1,19 +1,17 @@
 
 from langchain.messages import AIMessage, SystemMessage, HumanMessage
 
-from langchain_deepseek import ChatDeepSeek
 from dotenv import load_dotenv
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # repo root, for the shared `common` package
+from common.llm import make_deepseek_llm
 
 load_dotenv()
 
-llm = ChatDeepSeek(
-    model="deepseek-chat",
-    temperature=0,
-    max_tokens=None,
-    timeout=None,
-    max_retries=2,
-    # other params...
-)
+# 发送前统计 token：聊天历史超出预算时丢弃最早的消息
+llm = make_deepseek_llm(temperature=0, instrumented=True, max_prompt_tokens=32000, budget_policy="drop_oldest")
 
 messages = [
     HumanMessage("你好"),
@@ -0,0 +1,268 @@
+"""
+Dependency-graph executor for CrewAI crews.
+
+Process.sequential runs tasks one after another even when they do not depend
+on each other. run_crew_dag builds a DAG from each task's `context` and runs
+every task as soon as all of its context tasks are done, with at most
+max_workers tasks at a time:
+
+    result = run_crew_dag(crew, max_workers=4)
+    print(result.raw)
+    print(result.critical_path_report())
+
+Unlike Process.sequential, a task without an explicit `context` does not
+receive the outputs of all earlier tasks; it becomes an independent root.
+A CrewAI Agent cannot run two tasks at once, so tasks of the same agent are
+still run one at a time; the report shows that wait as queueing.
+
+Only the task-level part of Crew.kickoff() is reproduced: each task gets the
+tools Crew would give it (delegation, code execution, multimodal, memory
+tools), but kickoff inputs, crew memory setup, step/task callbacks and the
+usage metrics of CrewOutput are not. Crews that need more (hierarchical
+process, planning, before/after kickoff callbacks, ConditionalTask) are
+rejected with a ValueError.
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable
+
+
+@dataclass
+class NodeRun:
+    """Timing of one node: when it became ready, started and finished."""
+    node: Hashable
+    name: str
+    deps: list
+    ready_at: float = 0.0
+    started_at: float = 0.0
+    finished_at: float = 0.0
+    output: Any = None
+
+    @property
+    def duration(self) -> float:
+        return self.finished_at - self.started_at
+
+    @property
+    def queued(self) -> float:
+        """Time spent ready but waiting for a free worker."""
+        return self.started_at - self.ready_at
+
+
+@dataclass
+class DagResult:
+    runs: dict = field(default_factory=dict)   # node -> NodeRun
+    started_at: float = 0.0
+    finished_at: float = 0.0
+
+    @property
+    def wall_time(self) -> float:
+        return self.finished_at - self.started_at
+
+    def critical_path(self) -> list[NodeRun]:
+        """The chain of runs that determined the wall time, first to last.
+
+        Walks back from the last node to finish, each time to the dependency
+        that finished last (the one the node actually waited for).
+        """
+        if not self.runs:
+            return []
+        run = max(self.runs.values(), key=lambda r: r.finished_at)
+        path = [run]
+        while run.deps:
+            run = max((self.runs[d] for d in run.deps), key=lambda r: r.finished_at)
+            path.append(run)
+        return path[::-1]
+
+    def critical_path_report(self) -> str:
+        total_work = sum(r.duration for r in self.runs.values())
+        lines = [
+            f"wall time {self.wall_time:.2f}s, task time {total_work:.2f}s "
+            f"(x{total_work / self.wall_time if self.wall_time else 0:.2f} parallelism)",
+            "critical path:",
+        ]
+        for run in self.critical_path():
+            offset = run.started_at - self.started_at
+            lines.append(f"  +{offset:7.2f}s  {run.duration:7.2f}s run  {run.queued:6.2f}s queued  {run.name}")
+        return "\n".join(lines)
+
+
+def run_dag(nodes: list, deps: Callable[[Any], list], execute: Callable[[Any, list], Any],
+            max_workers: int = 4, name: Callable[[Any], str] = str,
+            exclusive: Callable[[Any], Hashable | None] = lambda node: None) -> DagResult:
+    """
+    Run every node once all of its dependencies have finished.
+
+    Args:
+        nodes: The nodes to run (hashable).
+        deps: Returns the nodes a node depends on.
+        execute: execute(node, [outputs of its deps, in deps order]) -> output.
+        max_workers: Maximum number of nodes running at once.
+        name: Label of a node in reports.
+        exclusive: Nodes with the same (non-None) key never run at the same
+            time; a ready node waits, counted as queued, until its key is free.
+
+    Raises:
+        ValueError: If the dependencies contain a cycle or an unknown node.
+        The first exception raised by execute; nodes not yet started are skipped.
+    """
+    result = DagResult()
+    remaining = {}
+    dependents: dict = {node: [] for node in nodes}
+    for node in nodes:
+        node_deps = list(deps(node))
+        for d in node_deps:
+            if d not in dependents:
+                raise ValueError(f"{name(node)!r} depends on a node that is not part of the graph")
+            dependents[d].append(node)
+        result.runs[node] = NodeRun(node, name(node), node_deps)
+        remaining[node] = len(node_deps)
+
+    def timed(node):
+        run = result.runs[node]
+        run.started_at = time.perf_counter()
+        try:
+            return execute(node, [result.runs[d].output for d in run.deps])
+        finally:
+            run.finished_at = time.perf_counter()
+
+    result.started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {}
+        busy = set()   # exclusive keys of running nodes
+        blocked = []   # ready nodes waiting for their exclusive key, in ready order
+
+        def start(node):
+            key = exclusive(node)
+            if key is not None:
+                if key in busy:
+                    blocked.append(node)
+                    return
+                busy.add(key)
+            futures[pool.submit(timed, node)] = node
+
+        def submit(node):
+            result.runs[node].ready_at = time.perf_counter()
+            start(node)
+
+        def release(node):
+            key = exclusive(node)
+            if key is None:
+                return
+            busy.discard(key)
+            for waiting in blocked:
+                if exclusive(waiting) == key:
+                    blocked.remove(waiting)
+                    start(waiting)
+                    break
+
+        for node in nodes:
+            if remaining[node] == 0:
+                submit(node)
+
+        done_count = 0
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = futures.pop(future)
+                release(node)
+                try:
+                    result.runs[node].output = future.result()
+                except Exception:
+                    for pending in futures:
+                        pending.cancel()
+                    raise
+                done_count += 1
+                # Hand the output downstream right away.
+                for child in dependents[node]:
+                    remaining[child] -= 1
+                    if remaining[child] == 0:
+                        submit(child)
+        if done_count != len(nodes):
+            raise ValueError("task dependencies contain a cycle")
+    result.finished_at = time.perf_counter()
+    return result
+
+
+@dataclass
+class CrewDagResult:
+    """Outputs of a DAG crew run plus the timings needed for reporting."""
+    dag: DagResult
+    tasks: list
+
+    def output(self, task):
+        return self.dag.runs[id(task)].output
+
+    @property
+    def final(self):
+        """Output of the crew's last task, like CrewOutput for Process.sequential."""
+        return self.output(self.tasks[-1])
+
+    @property
+    def raw(self) -> str:
+        return self.final.raw
+
+    def critical_path_report(self) -> str:
+        return self.dag.critical_path_report()
+
+
+def _task_name(task) -> str:
+    label = getattr(task, "name", None) or " ".join(task.description.split())
+    return label if len(label) <= 40 else label[:37] + "..."
+
+
+def _check_supported(crew) -> None:
+    from crewai import Process
+    from crewai.tasks.conditional_task import ConditionalTask
+
+    unsupported = []
+    if crew.process != Process.sequential:
+        unsupported.append(f"process={crew.process}")
+    if crew.planning:
+        unsupported.append("planning")
+    if crew.before_kickoff_callbacks or crew.after_kickoff_callbacks:
+        unsupported.append("before/after kickoff callbacks")
+    unsupported += [f"ConditionalTask {_task_name(t)!r}" for t in crew.tasks if isinstance(t, ConditionalTask)]
+    unsupported += [f"task {_task_name(t)!r} has no agent" for t in crew.tasks if t.agent is None]
+    if unsupported:
+        raise ValueError("run_crew_dag does not support: " + ", ".join(unsupported) + "; use crew.kickoff()")
+
+
+def run_crew_dag(crew, max_workers: int = 4) -> CrewDagResult:
+    """
+    Run a crew's tasks as a DAG built from their `context` lists.
+
+    Each task is executed like Crew._execute_tasks does it: Task.execute_sync
+    with the tools prepared by the crew, and the raw outputs of its context
+    tasks as context. Tasks that share an agent are serialized, since an
+    agent's executor is not reentrant.
+
+    Raises:
+        ValueError: If the crew relies on kickoff setup this does not
+            reproduce (see the module docstring).
+    """
+    from crewai.utilities.formatter import aggregate_raw_outputs_from_task_outputs
+
+    _check_supported(crew)
+    by_id = {id(task): task for task in crew.tasks}
+
+    def deps(task_id):
+        context = by_id[task_id].context
+        # Task.context is None / NOT_SPECIFIED when not given explicitly.
+        return [id(t) for t in context] if isinstance(context, list) else []
+
+    def execute(task_id, upstream_outputs):
+        task = by_id[task_id]
+        context = aggregate_raw_outputs_from_task_outputs(upstream_outputs) if upstream_outputs else None
+        # Delegation, code execution, multimodal and memory tools are added by
+        # the crew, not the task; without them such agents would lose them.
+        tools = crew._prepare_tools(task.agent, task, task.tools or task.agent.tools or [])
+        return task.execute_sync(agent=task.agent, context=context, tools=tools)
+
+    def agent_key(task_id):
+        agent = by_id[task_id].agent
+        return id(agent) if agent is not None else None
+
+    dag = run_dag(list(by_id), deps, execute, max_workers,
+                  name=lambda task_id: _task_name(by_id[task_id]), exclusive=agent_key)
+    return CrewDagResult(dag, list(crew.tasks))
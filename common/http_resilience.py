@@ -0,0 +1,117 @@
+"""
+httpx transports that route every request through common.resilience.
+
+Both the OpenAI client and ChatDeepSeek accept custom httpx clients, so the
+shared circuit breaker / retry policy can be attached to any of them:
+
+    http_client, http_async_client = resilient_http_clients("deepseek")
+    llm = ChatDeepSeek(..., max_retries=0,
+                       http_client=http_client, http_async_client=http_async_client)
+
+max_retries=0 hands retrying over to the shared RetryPolicy and RetryBudget
+instead of the SDK's fixed per-instance retries.
+"""
+import time
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+from common.resilience import Resilience, Throttled, get_resilience
+
+# Status codes worth retrying; anything else is returned to the SDK as-is.
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryableStatusError(Exception):
+    """A response with a retryable status code, raised so it counts as a failure.
+
+    retry_after carries the Retry-After header, which RetryPolicy.delay uses
+    as the minimum wait before the next attempt.
+    """
+
+    def __init__(self, response: httpx.Response):
+        super().__init__(f"HTTP {response.status_code}")
+        self.response = response
+        self.retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+
+class ThrottledStatusError(RetryableStatusError, Throttled):
+    """A 429 response: retried, but not counted against the circuit breaker."""
+
+
+def _retryable_error(response: httpx.Response) -> RetryableStatusError:
+    if response.status_code == 429:
+        return ThrottledStatusError(response)
+    return RetryableStatusError(response)
+
+
+class ResilientTransport(httpx.BaseTransport):
+    """Sync transport: retries and circuit breaking around an inner transport."""
+
+    def __init__(self, resilience: Resilience, transport: httpx.BaseTransport | None = None):
+        self.resilience = resilience
+        self.transport = transport or httpx.HTTPTransport()
+
+    def _send(self, request: httpx.Request) -> httpx.Response:
+        response = self.transport.handle_request(request)
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            response.read()
+            raise _retryable_error(response)
+        return response
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        try:
+            return self.resilience.call(self._send, request)
+        except RetryableStatusError as e:
+            # Out of retries: let the SDK turn the last response into its own error.
+            return e.response
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+class AsyncResilientTransport(httpx.AsyncBaseTransport):
+    """Async transport: retries and circuit breaking around an inner transport."""
+
+    def __init__(self, resilience: Resilience, transport: httpx.AsyncBaseTransport | None = None):
+        self.resilience = resilience
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        response = await self.transport.handle_async_request(request)
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            await response.aread()
+            raise _retryable_error(response)
+        return response
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        try:
+            return await self.resilience.acall(self._send, request)
+        except RetryableStatusError as e:
+            return e.response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def resilient_http_clients(key: str, **kwargs) -> tuple[httpx.Client, httpx.AsyncClient]:
+    """Sync and async httpx clients sharing the process-wide Resilience for `key`."""
+    resilience = get_resilience(key, **kwargs)
+    return (
+        httpx.Client(transport=ResilientTransport(resilience)),
+        httpx.AsyncClient(transport=AsyncResilientTransport(resilience)),
+    )
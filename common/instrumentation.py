@@ -0,0 +1,349 @@
+"""
+Per-call instrumentation for LangChain chains, agents and chat models.
+
+Attach it to any Runnable with one line:
+
+    full_chain = instrument(full_chain)
+
+Every model call inside then emits one span with the chain step it ran in,
+the model, prompt/completion tokens, time-to-first-token (streamed calls
+only, null otherwise), total latency and the number of transport retries
+(see common.resilience). Spans are appended to a JSONL file
+(LLM_TRACE_PATH, default llm_trace.jsonl) and recorded in in-process latency
+histograms.
+
+Summarize a run from the command line:
+
+    python -m common.instrumentation llm_trace.jsonl --by step --top 10
+"""
+import argparse
+import bisect
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from common.resilience import current_retry_counter
+
+# Upper bounds (seconds) of the histogram buckets; the last bucket is open.
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with approximate percentiles."""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket containing the pct-th percentile."""
+        if not self.count:
+            return 0.0
+        rank = self.count * pct / 100
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_s": self.total / self.count if self.count else 0.0,
+            "p50_s": self.percentile(50),
+            "p95_s": self.percentile(95),
+            "p99_s": self.percentile(99),
+            "max_s": self.max,
+        }
+
+
+class JsonlSink:
+    """Appends one JSON object per line; safe to share between threads."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def _usage(response) -> tuple[int | None, int | None]:
+    """(prompt_tokens, completion_tokens) from an LLMResult, if the provider reported them."""
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage.get("input_tokens"), usage.get("output_tokens")
+    token_usage = (response.llm_output or {}).get("token_usage") or {}
+    return token_usage.get("prompt_tokens"), token_usage.get("completion_tokens")
+
+
+class _RetryCounter(list):
+    """The [count] list current_retry_counter expects, shared by the model runs
+    started in one context before any of them finished (a multi-prompt
+    generate/batch call); the token restores the previous counter."""
+
+    def __init__(self):
+        super().__init__([0])
+        self.open_runs = 0
+        self.token = None
+
+
+def _run_name(serialized: dict | None, tags: list[str] | None, kwargs: dict, default: str) -> str:
+    # Branches of a RunnableParallel are tagged "map:key:<key>"; the key is
+    # far more telling than "RunnableSequence".
+    for tag in tags or []:
+        if tag.startswith("map:key:"):
+            return tag[len("map:key:"):]
+    return kwargs.get("name") or (serialized or {}).get("name") or default
+
+
+class LLMInstrumentation(BaseCallbackHandler):
+    """Callback handler that turns every model call into a span."""
+
+    # Run inline (not in a thread pool) so the retry counter set in
+    # on_chat_model_start lives in the same context as the HTTP request.
+    run_inline = True
+
+    def __init__(self, sink: JsonlSink | None = None):
+        self.sink = sink
+        self.trace_id = uuid.uuid4().hex
+        self.histograms: dict[tuple[str, str], LatencyHistogram] = defaultdict(LatencyHistogram)
+        self._runs: dict[UUID, tuple[str, UUID | None]] = {}
+        self._calls: dict[UUID, dict] = {}
+        self._lock = threading.Lock()
+
+    # --- chain bookkeeping: remember names so model calls know their step ---
+
+    def on_chain_start(self, serialized: dict | None, inputs: Any, *, run_id: UUID,
+                       parent_run_id: UUID | None = None, tags: list[str] | None = None,
+                       **kwargs: Any) -> None:
+        name = _run_name(serialized, tags, kwargs, "chain")
+        with self._lock:
+            self._runs[run_id] = (name, parent_run_id)
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._runs.pop(run_id, None)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._runs.pop(run_id, None)
+
+    def _step(self, parent_run_id: UUID | None, own_name: str) -> str:
+        names = [own_name]
+        with self._lock:
+            while parent_run_id in self._runs:
+                name, parent_run_id = self._runs[parent_run_id]
+                names.append(name)
+        return " > ".join(reversed(names))
+
+    # --- model calls ---
+
+    def _start(self, serialized: dict | None, run_id: UUID, parent_run_id: UUID | None,
+               tags: list[str] | None, metadata: dict | None, kwargs: dict) -> None:
+        serialized = serialized or {}
+        model = ((metadata or {}).get("ls_model_name")
+                 or serialized.get("kwargs", {}).get("model")
+                 or serialized.get("name", "unknown"))
+        with self._lock:
+            retries = current_retry_counter.get()
+            if not (isinstance(retries, _RetryCounter) and retries.open_runs):
+                retries = _RetryCounter()
+                retries.token = current_retry_counter.set(retries)
+            retries.open_runs += 1
+        call = {
+            "start": time.perf_counter(),
+            "ts": time.time(),
+            "step": self._step(parent_run_id, _run_name(serialized, tags, kwargs, "llm")),
+            "model": model,
+            "first_token": None,
+            "retries": retries,
+        }
+        with self._lock:
+            self._calls[run_id] = call
+
+    def on_chat_model_start(self, serialized: dict | None, messages: Any, *, run_id: UUID,
+                            parent_run_id: UUID | None = None, tags: list[str] | None = None,
+                            metadata: dict | None = None, **kwargs: Any) -> None:
+        self._start(serialized, run_id, parent_run_id, tags, metadata, kwargs)
+
+    def on_llm_start(self, serialized: dict | None, prompts: list[str], *, run_id: UUID,
+                     parent_run_id: UUID | None = None, tags: list[str] | None = None,
+                     metadata: dict | None = None, **kwargs: Any) -> None:
+        self._start(serialized, run_id, parent_run_id, tags, metadata, kwargs)
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        call = self._calls.get(run_id)
+        if call is not None and call["first_token"] is None:
+            call["first_token"] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs: Any) -> None:
+        prompt_tokens, completion_tokens = _usage(response)
+        self._finish(run_id, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, error=f"{type(error).__name__}: {error}")
+
+    def _finish(self, run_id: UUID, prompt_tokens: int | None = None,
+                completion_tokens: int | None = None, error: str | None = None) -> None:
+        with self._lock:
+            call = self._calls.pop(run_id, None)
+        if call is None:
+            return
+        retries = call["retries"]
+        with self._lock:
+            retries.open_runs -= 1
+            last = retries.open_runs == 0
+        if last:
+            # Last run of the group: stop counting into this (finished) span.
+            try:
+                current_retry_counter.reset(retries.token)
+            except ValueError:  # finished in a different context than it started
+                pass
+        end = time.perf_counter()
+        latency = end - call["start"]
+        streamed = call["first_token"] is not None
+        span = {
+            "trace_id": self.trace_id,
+            "span_id": str(run_id),
+            "ts": call["ts"],
+            "step": call["step"],
+            "model": call["model"],
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            # Only measurable when streaming; otherwise it would just repeat latency.
+            "ttft_s": call["first_token"] - call["start"] if streamed else None,
+            "latency_s": latency,
+            "streamed": streamed,
+            # The prompts of one generate call share their HTTP retries, so the
+            # group's count goes to the run that finishes last and 0 to the rest.
+            "retries": retries[0] if last else 0,
+            "error": error,
+        }
+        with self._lock:
+            self.histograms[(call["step"], call["model"])].record(latency)
+        if self.sink is not None:
+            self.sink.write(span)
+
+    def summary(self) -> dict[str, dict]:
+        """Latency histogram summaries of this process, keyed by "step [model]"."""
+        with self._lock:
+            items = list(self.histograms.items())
+        return {f"{step} [{model}]": h.summary() for (step, model), h in items}
+
+
+_instrumentation: LLMInstrumentation | None = None
+_instrumentation_lock = threading.Lock()
+
+
+def get_instrumentation() -> LLMInstrumentation:
+    """The process-wide handler, writing to LLM_TRACE_PATH (default llm_trace.jsonl)."""
+    global _instrumentation
+    with _instrumentation_lock:
+        if _instrumentation is None:
+            path = os.getenv("LLM_TRACE_PATH", "llm_trace.jsonl")
+            _instrumentation = LLMInstrumentation(JsonlSink(path) if path else None)
+        return _instrumentation
+
+
+def instrument(runnable, name: str | None = None):
+    """Attach the process-wide instrumentation to a chain, agent or model."""
+    config: dict = {"callbacks": [get_instrumentation()]}
+    if name:
+        config["run_name"] = name
+    return runnable.with_config(config)
+
+
+# --- CLI: summarize hot spots of a trace file ---
+
+def load_spans(path: str, trace_id: str | None = None) -> list[dict]:
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                span = json.loads(line)
+                if trace_id is None or span.get("trace_id") == trace_id:
+                    spans.append(span)
+    return spans
+
+
+def summarize(spans: list[dict], by: str = "step") -> list[dict]:
+    """Aggregate spans per `by` key ("step", "model" or "both"), slowest total first."""
+    groups: dict[str, list[dict]] = defaultdict(list)
+    for span in spans:
+        key = f"{span['step']} [{span['model']}]" if by == "both" else span[by]
+        groups[key].append(span)
+
+    grand_total = sum(s["latency_s"] for s in spans) or 1.0
+    rows = []
+    for key, items in groups.items():
+        latencies = sorted(s["latency_s"] for s in items)
+        total = sum(latencies)
+        ttfts = [s["ttft_s"] for s in items if s.get("ttft_s") is not None]
+        rows.append({
+            "key": key,
+            "calls": len(items),
+            "total_s": total,
+            "share": total / grand_total,
+            "p50_s": latencies[len(latencies) // 2],
+            "p95_s": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+            "ttft_mean_s": sum(ttfts) / len(ttfts) if ttfts else None,
+            "prompt_tokens": sum(s["prompt_tokens"] or 0 for s in items),
+            "completion_tokens": sum(s["completion_tokens"] or 0 for s in items),
+            "retries": sum(s["retries"] for s in items),
+            "errors": sum(1 for s in items if s["error"]),
+        })
+    rows.sort(key=lambda r: r["total_s"], reverse=True)
+    return rows
+
+
+def _seconds(value: float | None) -> str:
+    return f"{value:6.2f}s" if value is not None else f"{'-':>7}"
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Summarize LLM call hot spots from a JSONL trace.")
+    parser.add_argument("path", nargs="?", default=os.getenv("LLM_TRACE_PATH", "llm_trace.jsonl"))
+    parser.add_argument("--by", choices=["step", "model", "both"], default="step")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--trace-id", help="only spans of this run (default: all runs in the file)")
+    args = parser.parse_args(argv)
+
+    spans = load_spans(args.path, args.trace_id)
+    if not spans:
+        print(f"No spans found in {args.path}")
+        return
+    rows = summarize(spans, args.by)
+    traces = len({s["trace_id"] for s in spans})
+    print(f"{len(spans)} calls in {traces} run(s), {sum(s['latency_s'] for s in spans):.2f}s total model time\n")
+    print(f"{'share':>6} {'total':>8} {'calls':>6} {'p50':>7} {'p95':>7} {'ttft':>7} "
+          f"{'prompt':>8} {'compl':>7} {'retry':>5} {'err':>4}  {args.by}")
+    for r in rows[:args.top]:
+        print(f"{r['share']:6.1%} {r['total_s']:7.2f}s {r['calls']:6} {r['p50_s']:6.2f}s {r['p95_s']:6.2f}s "
+              f"{_seconds(r['ttft_mean_s'])} {r['prompt_tokens']:8} {r['completion_tokens']:7} "
+              f"{r['retries']:5} {r['errors']:4}  {r['key']}")
+
+
+if __name__ == "__main__":
+    main()
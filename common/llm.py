@@ -0,0 +1,54 @@
+"""
+The DeepSeek chat model used by the chapter examples, with the shared plumbing
+attached in one place:
+
+    llm = make_deepseek_llm(temperature=0)
+    llm = make_deepseek_llm(instrumented=True, max_prompt_tokens=32000, budget_policy="drop_oldest")
+
+- HTTP calls go through the process-wide "deepseek" circuit breaker and
+  RetryPolicy (common.http_resilience), so the SDK's own retries are off.
+- instrumented=True records a span per model call (common.instrumentation).
+  Chapters that instrument a whole chain instead leave this off, so spans
+  are named after the chain's steps.
+- max_prompt_tokens puts a pre-flight token budget in front of the model
+  (common.token_budget).
+"""
+from langchain_deepseek import ChatDeepSeek
+
+from common.http_resilience import resilient_http_clients
+from common.instrumentation import instrument
+from common.token_budget import with_token_budget
+
+
+def make_deepseek_llm(temperature: float = 0, instrumented: bool = False,
+                      max_prompt_tokens: int | None = None, budget_policy: str = "raise",
+                      keep_first: int = 0, **kwargs):
+    """
+    Create the deepseek-chat model.
+
+    Args:
+        temperature: Sampling temperature.
+        instrumented: Record latency/token spans for every call of the model.
+        max_prompt_tokens: Token budget per call; None disables budgeting.
+        budget_policy: What to do over budget: "raise", "drop_oldest" or
+            "truncate_middle" (see common.token_budget).
+        keep_first: Messages "drop_oldest" must never drop.
+        **kwargs: Passed to ChatDeepSeek.
+
+    Returns:
+        ChatDeepSeek, or a Runnable wrapping it when instrumented or budgeted.
+    """
+    http_client, http_async_client = resilient_http_clients("deepseek")
+    options = {"model": "deepseek-chat", "max_tokens": None, "timeout": None, **kwargs}
+    llm = ChatDeepSeek(
+        temperature=temperature,
+        max_retries=0,  # retries are handled by the shared "deepseek" RetryPolicy
+        http_client=http_client,
+        http_async_client=http_async_client,
+        **options,
+    )
+    if instrumented:
+        llm = instrument(llm)
+    if max_prompt_tokens is not None:
+        llm = with_token_budget(llm, max_prompt_tokens, budget_policy, keep_first)
+    return llm
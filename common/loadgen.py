@@ -0,0 +1,147 @@
+"""
+Open-loop load generator for the chapter chains.
+
+Drives coordinator_agent (Chapter 2) or full_parallel_chain (Chapter 3) at a
+target request rate and reports latency percentiles, throughput and errors:
+
+    python -m common.stub_llm_server --port 8000 &
+    python -m common.loadgen coordinator --qps 20 --duration 30 --base-url http://127.0.0.1:8000
+
+Requests are started on a fixed schedule whether or not earlier ones have
+finished (open loop), and latency is measured from the scheduled start, so a
+saturated backend shows up as queueing delay instead of a lower request rate.
+"""
+import argparse
+import asyncio
+import importlib.util
+import os
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# target name -> (chapter file, runnable attribute, sample inputs)
+TARGETS = {
+    "coordinator": (
+        "Chapter2-Routing/example_LangChain.py",
+        "coordinator_agent",
+        [{"request": "我想预订一个航班到纽约"}, {"request": "纽约的天气怎么样"}, {"request": "你好"}],
+    ),
+    "parallel": (
+        "Chapter3-Parallelization/example_LangChain.py",
+        "full_parallel_chain",
+        [{"topic": "The history of space exploration"}, {"topic": "Quantum computing"}],
+    ),
+}
+
+
+def load_target(name: str):
+    """Import a chapter module by path and return its runnable and sample inputs."""
+    relative_path, attribute, inputs = TARGETS[name]
+    path = REPO_ROOT / relative_path
+    spec = importlib.util.spec_from_file_location(f"loadgen_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.path.insert(0, str(path.parent))
+    spec.loader.exec_module(module)
+    return getattr(module, attribute), inputs
+
+
+def percentile(ordered: list[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run_load(runnable, inputs: list[dict], qps: float, duration: float,
+                   max_in_flight: int = 1000, poisson: bool = False) -> dict:
+    """
+    Fire requests at `qps` for `duration` seconds and collect the outcomes.
+
+    Returns:
+        dict with latencies (successful requests), errors (Counter of error
+        types), sent, dropped (skipped because max_in_flight was reached) and
+        elapsed wall time.
+    """
+    latencies: list[float] = []
+    errors: Counter = Counter()
+    in_flight = 0
+    dropped = 0
+    tasks = []
+
+    async def one(payload: dict, scheduled: float):
+        nonlocal in_flight
+        try:
+            await runnable.ainvoke(payload)
+            latencies.append(time.perf_counter() - scheduled)
+        except Exception as e:
+            errors[type(e).__name__] += 1
+        finally:
+            in_flight -= 1
+
+    start = time.perf_counter()
+    next_at = start
+    sent = 0
+    while next_at - start < duration:
+        await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+        if in_flight >= max_in_flight:
+            dropped += 1
+        else:
+            in_flight += 1
+            sent += 1
+            tasks.append(asyncio.ensure_future(one(random.choice(inputs), next_at)))
+        next_at += random.expovariate(qps) if poisson else 1 / qps
+
+    await asyncio.gather(*tasks)
+    return {
+        "latencies": sorted(latencies),
+        "errors": errors,
+        "sent": sent,
+        "dropped": dropped,
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+def print_report(name: str, qps: float, result: dict) -> None:
+    ok = len(result["latencies"])
+    failed = sum(result["errors"].values())
+    print(f"\n=== {name}: target {qps:g} QPS, {result['sent']} sent in {result['elapsed']:.1f}s ===")
+    print(f"throughput : {ok / result['elapsed']:.2f} successful req/s")
+    print(f"errors     : {failed} ({failed / max(1, result['sent']):.1%})"
+          + (f"  {dict(result['errors'])}" if failed else ""))
+    if result["dropped"]:
+        print(f"dropped    : {result['dropped']} (max in-flight reached)")
+    lat = result["latencies"]
+    print(f"latency    : p50 {percentile(lat, 50) * 1000:.0f}ms  p95 {percentile(lat, 95) * 1000:.0f}ms"
+          f"  p99 {percentile(lat, 99) * 1000:.0f}ms  max {(lat[-1] if lat else 0) * 1000:.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive a chapter chain at a target QPS.")
+    parser.add_argument("target", choices=sorted(TARGETS))
+    parser.add_argument("--qps", type=float, default=10.0)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000",
+                        help="OpenAI-compatible endpoint, normally common.stub_llm_server")
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--poisson", action="store_true", help="exponential inter-arrival times")
+    args = parser.parse_args()
+
+    # Must be set before the chapter module creates its ChatDeepSeek; load_dotenv
+    # does not override variables that are already set.
+    os.environ["DEEPSEEK_API_BASE"] = args.base_url
+    os.environ.setdefault("DEEPSEEK_API_KEY", "stub")
+
+    runnable, inputs = load_target(args.target)
+    result = asyncio.run(run_load(runnable, inputs, args.qps, args.duration, args.max_in_flight, args.poisson))
+    print_report(args.target, args.qps, result)
+
+    from common.resilience import breaker_metrics
+    for key, metrics in breaker_metrics().items():
+        print(f"breaker    : {key} {metrics}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""
+Process-wide circuit breakers and retry policies, keyed by tool or endpoint.
+
+Every caller that uses the same key (e.g. "deepseek" or "precise_location")
+shares one Resilience object, so a backend that is down is detected once and
+then skipped by everyone until it recovers:
+
+    resilience = get_resilience("precise_location")
+    result = resilience.call(lookup, address, fallback=general_lookup)
+
+- Retries use exponential backoff with full jitter and are limited by a
+  RetryBudget, so a failing backend does not receive a retry storm. An error
+  with a `retry_after` attribute (seconds, e.g. from a Retry-After header)
+  waits at least that long, or is not retried if that exceeds max_delay.
+- While a circuit is open, calls go straight to the fallback (or raise
+  CircuitOpenError) without touching the primary.
+- Throttled errors (e.g. HTTP 429) are retried but do not count as breaker
+  failures: a rate-limiting backend is healthy, just busy.
+- breaker_metrics() / render_prometheus() expose breaker states as metrics.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Numeric encoding of the states for metrics backends.
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Optional per-call retry counter ([count]); set by callers that want to know
+# how many retries a single logical call needed (see common.instrumentation).
+current_retry_counter: ContextVar[list | None] = ContextVar("current_retry_counter", default=None)
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because its circuit is open."""
+
+    def __init__(self, key: str):
+        super().__init__(f"circuit '{key}' is open")
+        self.key = key
+
+
+class Throttled(Exception):
+    """Base for errors meaning "slow down" rather than "broken" (e.g. HTTP 429).
+
+    Retried like other errors, but never recorded as a circuit breaker failure.
+    """
+    retry_after: float | None = None
+
+
+class CircuitBreaker:
+    """
+    Classic three-state circuit breaker.
+
+    - closed: calls pass; failure_threshold consecutive failures open it.
+    - open: calls are rejected until reset_timeout seconds have passed.
+    - half_open: up to half_open_max_calls trial calls pass; a success closes
+      the circuit, a failure opens it again.
+    """
+
+    def __init__(self, key: str, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 half_open_max_calls: int = 1):
+        self.key = key
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._lock = threading.Lock()
+        # Counters exposed through metrics().
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    def _transition(self, state: str) -> None:
+        if state != self._state:
+            logger.info("circuit '%s': %s -> %s", self.key, self._state, state)
+            self._state = state
+            if state == OPEN:
+                self._opened_at = time.monotonic()
+                self.times_opened += 1
+            if state == HALF_OPEN:
+                self._half_open_calls = 0
+
+    def _refresh(self) -> None:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._transition(HALF_OPEN)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def allow_request(self) -> bool:
+        """Whether a call may go to the backend now (counts as a trial when half open)."""
+        with self._lock:
+            self._refresh()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.successes += 1
+            self._consecutive_failures = 0
+            self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._consecutive_failures += 1
+            if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self._transition(OPEN)
+
+    def record_cancelled(self) -> None:
+        """A call was abandoned without an outcome (e.g. a hedged loser): free its trial slot."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._half_open_calls > 0:
+                self._half_open_calls -= 1
+
+    def metrics(self) -> dict:
+        state = self.state
+        return {
+            "state": state,
+            "state_value": STATE_VALUES[state],
+            "successes": self.successes,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "times_opened": self.times_opened,
+        }
+
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of normal traffic.
+
+    Each first attempt deposits `ratio` tokens and each retry withdraws one, so
+    with ratio=0.2 at most ~20% extra load is generated while a backend
+    struggles. min_per_second tokens are refilled over time so that low-traffic
+    callers can still retry.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+        self.exhausted = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.max_tokens, self._tokens + (now - self._last_refill) * self.min_per_second)
+        self._last_refill = now
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            self.exhausted += 1
+            return False
+
+
+@dataclass
+class RetryPolicy:
+    """How often and how fast to retry: exponential backoff with full jitter."""
+    max_attempts: int = 3
+    base_delay: float = 0.2
+    max_delay: float = 5.0
+    retry_on: tuple = (Exception,)
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number `attempt` (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def retry_after(self, error: Exception) -> float:
+        """The wait the server asked for (`retry_after` attribute), 0 if none."""
+        return getattr(error, "retry_after", None) or 0.0
+
+    def allows(self, attempt: int, error: Exception) -> bool:
+        """Whether attempt number `attempt` failing with `error` may be retried."""
+        return (isinstance(error, self.retry_on) and attempt < self.max_attempts
+                # A longer server-requested wait would block the caller; give up instead.
+                and self.retry_after(error) <= self.max_delay)
+
+    def delay(self, attempt: int, error: Exception) -> float:
+        """Backoff, but never shorter than the server's requested `retry_after`."""
+        return min(self.max_delay, max(self.backoff(attempt), self.retry_after(error)))
+
+
+class Resilience:
+    """Circuit breaker + retry policy + retry budget for one tool or endpoint."""
+
+    def __init__(self, key: str, breaker: CircuitBreaker | None = None,
+                 policy: RetryPolicy | None = None, budget: RetryBudget | None = None):
+        self.key = key
+        self.breaker = breaker or CircuitBreaker(key)
+        self.policy = policy or RetryPolicy()
+        self.budget = budget or RetryBudget()
+        self.retries = 0
+        self.throttled = 0
+
+    def _record_error(self, error: Exception) -> None:
+        if isinstance(error, Throttled):
+            self.throttled += 1
+            # No verdict on the backend's health: just free a half-open trial slot.
+            self.breaker.record_cancelled()
+        else:
+            self.breaker.record_failure()
+
+    def _may_retry(self, attempt: int, error: Exception) -> bool:
+        if not self.policy.allows(attempt, error):
+            return False
+        if not self.budget.try_withdraw():
+            return False
+        self.retries += 1
+        counter = current_retry_counter.get()
+        if counter is not None:
+            counter[0] += 1
+        return True
+
+    def call(self, func: Callable, *args, fallback: Callable | None = None, **kwargs) -> Any:
+        """
+        Call func(*args, **kwargs) with retries behind the circuit breaker.
+
+        If the circuit is open, or every attempt failed, fallback(*args,
+        **kwargs) is returned instead; without a fallback the error (or
+        CircuitOpenError) is raised.
+        """
+        self.budget.deposit()
+        attempt = 0
+        error: Exception = CircuitOpenError(self.key)
+        while self.breaker.allow_request():
+            attempt += 1
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                error = e
+                self._record_error(e)
+                if not self._may_retry(attempt, e):
+                    break
+                time.sleep(self.policy.delay(attempt, e))
+            else:
+                self.breaker.record_success()
+                return result
+        if fallback is not None:
+            return fallback(*args, **kwargs)
+        raise error
+
+    async def acall(self, func: Callable, *args, fallback: Callable | None = None, **kwargs) -> Any:
+        """Async version of call(): func and fallback are coroutine functions."""
+        self.budget.deposit()
+        attempt = 0
+        error: Exception = CircuitOpenError(self.key)
+        while self.breaker.allow_request():
+            attempt += 1
+            try:
+                result = await func(*args, **kwargs)
+            except asyncio.CancelledError:
+                self.breaker.record_cancelled()
+                raise
+            except Exception as e:
+                error = e
+                self._record_error(e)
+                if not self._may_retry(attempt, e):
+                    break
+                await asyncio.sleep(self.policy.delay(attempt, e))
+            else:
+                self.breaker.record_success()
+                return result
+        if fallback is not None:
+            return await fallback(*args, **kwargs)
+        raise error
+
+    def metrics(self) -> dict:
+        return {**self.breaker.metrics(), "retries": self.retries, "throttled": self.throttled,
+                "retry_budget_exhausted": self.budget.exhausted}
+
+
+_registry: dict[str, Resilience] = {}
+_registry_lock = threading.Lock()
+
+
+def get_resilience(key: str, **kwargs) -> Resilience:
+    """
+    Return the process-wide Resilience for `key`, creating it on first use.
+
+    kwargs (breaker, policy, budget) only apply when the entry is created.
+    """
+    with _registry_lock:
+        if key not in _registry:
+            _registry[key] = Resilience(key, **kwargs)
+        return _registry[key]
+
+
+def breaker_metrics() -> dict[str, dict]:
+    """Metrics of every registered breaker, keyed by tool / endpoint."""
+    with _registry_lock:
+        entries = list(_registry.values())
+    return {entry.key: entry.metrics() for entry in entries}
+
+
+def render_prometheus() -> str:
+    """Breaker metrics in the Prometheus text exposition format."""
+    lines = []
+    for key, m in breaker_metrics().items():
+        for name in ("state_value", "successes", "failures", "rejected", "times_opened",
+                     "retries", "throttled", "retry_budget_exhausted"):
+            metric = "circuit_breaker_state" if name == "state_value" else f"circuit_breaker_{name}_total"
+            lines.append(f'{metric}{{key="{key}"}} {m[name]}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,105 @@
+"""
+Dictionary-dispatch router runnable.
+
+A drop-in replacement for a RunnableBranch whose conditions all compare one
+label against constants. The label is looked up in a dict, so dispatch costs
+the same for 3 routes or 500, and the handler's return value is the router's
+output (no RunnablePassthrough.assign copies of the input):
+
+    router = DispatchRouter(
+        {"booker": booking_handler, "info": info_handler},
+        default=unclear_handler,
+        label=lambda x: x["decision"],
+        argument=lambda x: x["raw"]["request"],
+    )
+    coordinator_agent = {"decision": router_chain, "raw": RunnablePassthrough()} | router
+
+Handlers may be plain functions, `async def` functions or Runnables:
+- ainvoke awaits async handlers directly and runs sync functions in the
+  executor, so a blocking handler never stalls the event loop.
+- invoke calls sync functions directly and runs async handlers with
+  asyncio.run; inside a running event loop (Jupyter, an async caller using
+  the sync API) that happens on a worker thread instead.
+"""
+import asyncio
+import contextvars
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Mapping
+
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.runnables.config import patch_config, run_in_executor
+
+
+def _run_async_handler(handler: Callable, argument: Any) -> Any:
+    """Run an async handler to completion from sync code."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(handler(argument))
+    # asyncio.run cannot nest in a running loop: use a fresh loop on a worker
+    # thread, with this thread's context (callbacks, tracing) copied over.
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(context.run, lambda: asyncio.run(handler(argument))).result()
+
+
+def normalize_label(label: Any) -> str:
+    """Default label normalisation: model output such as " Info\\n" -> "info"."""
+    return str(label).strip().lower()
+
+
+class DispatchRouter(Runnable[Any, Any]):
+    """Route each input to one handler by a label, with O(1) lookup."""
+
+    def __init__(self, routes: Mapping[str, Any], default: Any,
+                 label: Callable[[Any], Any] = lambda x: x["decision"],
+                 argument: Callable[[Any], Any] = lambda x: x,
+                 normalize: Callable[[Any], str] | None = normalize_label,
+                 name: str | None = None):
+        """
+        Args:
+            routes: label -> handler. Labels are normalized like the inputs.
+            default: Handler for labels that match no route.
+            label: Extracts the routing label from the input.
+            argument: Extracts what is passed to the handler.
+            normalize: Applied to the extracted label (None to match as-is).
+            name: Run name shown in traces.
+        """
+        self.normalize = normalize
+        self.routes = {(normalize(k) if normalize else k): handler for k, handler in routes.items()}
+        self.default = default
+        self.label = label
+        self.argument = argument
+        self.name = name or "DispatchRouter"
+
+    def route(self, input: Any) -> Any:
+        """The handler an input is dispatched to."""
+        key = self.label(input)
+        if self.normalize is not None:
+            key = self.normalize(key)
+        return self.routes.get(key, self.default)
+
+    def _invoke(self, input, run_manager, config):
+        handler = self.route(input)
+        argument = self.argument(input)
+        if isinstance(handler, Runnable):
+            return handler.invoke(argument, patch_config(config, callbacks=run_manager.get_child()))
+        if inspect.iscoroutinefunction(handler):
+            return _run_async_handler(handler, argument)
+        return handler(argument)
+
+    async def _ainvoke(self, input, run_manager, config):
+        handler = self.route(input)
+        argument = self.argument(input)
+        if isinstance(handler, Runnable):
+            return await handler.ainvoke(argument, patch_config(config, callbacks=run_manager.get_child()))
+        if inspect.iscoroutinefunction(handler):
+            return await handler(argument)
+        return await run_in_executor(config, handler, argument)
+
+    def invoke(self, input: Any, config: RunnableConfig | None = None, **kwargs: Any) -> Any:
+        return self._call_with_config(self._invoke, input, config, **kwargs)
+
+    async def ainvoke(self, input: Any, config: RunnableConfig | None = None, **kwargs: Any) -> Any:
+        return await self._acall_with_config(self._ainvoke, input, config, **kwargs)
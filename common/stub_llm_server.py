@@ -0,0 +1,223 @@
+"""
+Local OpenAI-compatible chat-completions stub server.
+
+Stands in for DeepSeek (or any OpenAI-compatible provider) so chains can be
+load-tested without touching the real API:
+
+    python -m common.stub_llm_server --port 8000 --latency 0.3 --tokens-per-second 40 \\
+        --error-rate 0.02 --rate-limit 50
+
+Point clients at it with DEEPSEEK_API_BASE=http://127.0.0.1:8000 (ChatDeepSeek)
+or DEEPSEEK_BASE_URL=http://127.0.0.1:8000 (DeepSeek.py).
+
+Supports POST /chat/completions and /v1/chat/completions, with and without
+"stream": true, plus GET /models. Only the standard library is used.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FILLER_WORDS = ("stub", "response", "from", "the", "local", "chat", "completions", "server")
+
+
+@dataclass
+class StubConfig:
+    """Behaviour of the stub server; every field maps to a CLI flag."""
+    latency: float = 0.2              # seconds before the first token
+    latency_jitter: float = 0.05      # uniform extra latency
+    tokens_per_second: float = 50.0   # completion token rate after the first token
+    completion_tokens: int = 30       # tokens per reply (capped by max_tokens)
+    reply: str | None = None          # fixed reply text instead of filler words
+    error_rate: float = 0.0           # share of requests answered with error_status
+    error_status: int = 500
+    rate_limit: float = 0.0           # requests per second, 0 = unlimited
+    burst: int = 10                   # token bucket size for rate limiting
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+def _estimate_tokens(messages: list) -> int:
+    text = "".join(str(m.get("content", "")) for m in messages)
+    return max(1, len(text) // 4)
+
+
+def make_handler(config: StubConfig):
+    bucket = TokenBucket(config.rate_limit, config.burst) if config.rate_limit > 0 else None
+    stats = {"requests": 0, "errors": 0, "rate_limited": 0}
+    stats_lock = threading.Lock()
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+        def log_message(self, format, *args):
+            pass  # one line per request would drown the load generator output
+
+        def _send_json(self, status: int, body: dict, headers: dict | None = None) -> None:
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _error(self, status: int, message: str, headers: dict | None = None) -> None:
+            self._send_json(status, {"error": {"message": message, "type": "stub_error", "code": status}}, headers)
+
+        def do_GET(self):
+            if self.path.rstrip("/") in ("/models", "/v1/models"):
+                self._send_json(200, {"object": "list", "data": [{"id": "deepseek-chat", "object": "model"}]})
+            elif self.path == "/stats":
+                with stats_lock:
+                    self._send_json(200, dict(stats))
+            else:
+                self._error(404, f"unknown path {self.path}")
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if self.path.rstrip("/") not in ("/chat/completions", "/v1/chat/completions"):
+                self._error(404, f"unknown path {self.path}")
+                return
+            with stats_lock:
+                stats["requests"] += 1
+            if bucket is not None and not bucket.try_acquire():
+                with stats_lock:
+                    stats["rate_limited"] += 1
+                self._error(429, "rate limit exceeded", {"Retry-After": "1"})
+                return
+            if random.random() < config.error_rate:
+                with stats_lock:
+                    stats["errors"] += 1
+                time.sleep(config.latency)
+                self._error(config.error_status, "injected error")
+                return
+
+            n_tokens = min(config.completion_tokens, body.get("max_tokens") or config.completion_tokens)
+            if config.reply is not None:
+                words = config.reply.split(" ")
+                pieces = [w if i == 0 else " " + w for i, w in enumerate(words)]
+            else:
+                pieces = [(" " if i else "") + FILLER_WORDS[i % len(FILLER_WORDS)] for i in range(n_tokens)]
+            usage = {
+                "prompt_tokens": _estimate_tokens(body.get("messages", [])),
+                "completion_tokens": len(pieces),
+                "total_tokens": 0,
+            }
+            usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+            completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+            model = body.get("model", "deepseek-chat")
+
+            time.sleep(config.latency + random.uniform(0, config.latency_jitter))
+            per_token = 1 / config.tokens_per_second if config.tokens_per_second > 0 else 0.0
+            if body.get("stream"):
+                self._stream(completion_id, model, pieces, per_token, usage, body)
+                return
+            time.sleep(per_token * max(0, len(pieces) - 1))
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(pieces)},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            })
+
+        def _stream(self, completion_id, model, pieces, per_token, usage, body):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+
+            def event(delta: dict, finish_reason=None, extra: dict | None = None):
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                    **(extra or {}),
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+
+            event({"role": "assistant", "content": ""})
+            for i, piece in enumerate(pieces):
+                if i:
+                    time.sleep(per_token)
+                event({"content": piece})
+            include_usage = (body.get("stream_options") or {}).get("include_usage")
+            event({}, "stop", {"usage": usage} if include_usage else None)
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+    return StubHandler
+
+
+def serve(config: StubConfig, host: str = "127.0.0.1", port: int = 8000) -> ThreadingHTTPServer:
+    """Create the server (call serve_forever() on it, possibly in a thread)."""
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible chat-completions stub server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    defaults = StubConfig()
+    parser.add_argument("--latency", type=float, default=defaults.latency)
+    parser.add_argument("--latency-jitter", type=float, default=defaults.latency_jitter)
+    parser.add_argument("--tokens-per-second", type=float, default=defaults.tokens_per_second)
+    parser.add_argument("--completion-tokens", type=int, default=defaults.completion_tokens)
+    parser.add_argument("--reply", help="fixed reply text (e.g. 'info' for the Chapter 2 router)")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--error-status", type=int, default=defaults.error_status)
+    parser.add_argument("--rate-limit", type=float, default=defaults.rate_limit, help="requests/second, 0 = off")
+    parser.add_argument("--burst", type=int, default=defaults.burst)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency=args.latency, latency_jitter=args.latency_jitter, tokens_per_second=args.tokens_per_second,
+        completion_tokens=args.completion_tokens, reply=args.reply, error_rate=args.error_rate,
+        error_status=args.error_status, rate_limit=args.rate_limit, burst=args.burst,
+    )
+    server = serve(config, args.host, args.port)
+    print(f"Stub chat-completions server on http://{args.host}:{args.port} ({config})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
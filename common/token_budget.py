@@ -0,0 +1,192 @@
+"""
+Pre-flight token budgeting for chat model calls.
+
+Counts the tokens of every message locally before the request is sent and
+enforces a per-call prompt budget, so oversized requests fail (or get
+trimmed) before paying for a huge context:
+
+    llm = with_token_budget(llm, max_prompt_tokens=16000, policy="drop_oldest")
+
+Policies:
+- "raise": raise TokenBudgetExceeded.
+- "drop_oldest": drop the oldest messages (system messages and the first
+  keep_first messages are kept, and so is the last message).
+- "truncate_middle": cut the middle out of the largest message until the
+  prompt fits (works for single-string prompts too).
+
+Token counts are cached per message content, so repeated segments such as
+system prompts or a growing chat history are only tokenized once.
+"""
+import logging
+from functools import lru_cache
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, convert_to_messages
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import RunnableLambda
+
+try:
+    import tiktoken
+except ImportError:  # fall back to an estimate, see TokenCounter
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Chat-format overhead per message and for priming the reply (OpenAI-style).
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+
+TRUNCATION_MARKER = "\n...[truncated]...\n"
+
+POLICIES = ("raise", "drop_oldest", "truncate_middle")
+
+
+class TokenBudgetExceeded(ValueError):
+    """Raised before dispatch when a prompt does not fit its token budget."""
+
+    def __init__(self, tokens: int, budget: int):
+        super().__init__(f"prompt has {tokens} tokens, budget is {budget}")
+        self.tokens = tokens
+        self.budget = budget
+
+
+def _is_cjk(ch: str) -> bool:
+    return "\u3000" <= ch <= "\u9fff" or "\uac00" <= ch <= "\ud7af" or "\uff00" <= ch <= "\uffef"
+
+
+class TokenCounter:
+    """
+    Local tokenizer with a per-text cache.
+
+    Uses tiktoken's `encoding` when tiktoken is installed (`pip3 install
+    tiktoken`). Otherwise tokens are estimated: one per CJK character and one
+    per four other characters, which is close enough for budgeting.
+    """
+
+    def __init__(self, encoding: str = "cl100k_base", cache_size: int = 4096):
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.get_encoding(encoding)
+            except Exception as e:
+                # tiktoken downloads encodings on first use; offline we estimate.
+                logger.warning("tiktoken encoding %r unavailable (%s), estimating tokens", encoding, e)
+        self.count = lru_cache(maxsize=cache_size)(self._count)
+
+    def _count(self, text: str) -> int:
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        cjk = sum(1 for ch in text if _is_cjk(ch))
+        return cjk + (len(text) - cjk + 3) // 4
+
+    def count_message(self, message: BaseMessage) -> int:
+        content = message.content
+        if isinstance(content, str):
+            text_tokens = self.count(content)
+        else:
+            # Multimodal content: only text parts are counted.
+            text_tokens = sum(self.count(part if isinstance(part, str) else part.get("text", ""))
+                              for part in content)
+        return TOKENS_PER_MESSAGE + text_tokens
+
+    def count_messages(self, messages: list[BaseMessage]) -> int:
+        return TOKENS_PER_REPLY + sum(self.count_message(m) for m in messages)
+
+    def truncate_middle(self, text: str, max_tokens: int) -> str:
+        """Shorten text to at most max_tokens by removing its middle."""
+        if self.count(text) <= max_tokens:
+            return text
+        keep = max(0, max_tokens - self.count(TRUNCATION_MARKER))
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            head = keep // 2
+            tail = keep - head
+            return (self.encoding.decode(tokens[:head]) + TRUNCATION_MARKER
+                    + (self.encoding.decode(tokens[-tail:]) if tail else ""))
+        # Estimated counts: shrink proportionally until it fits.
+        chars = len(text) * keep // max(1, self.count(text))
+        while True:
+            head = chars // 2
+            candidate = text[:head] + TRUNCATION_MARKER + text[len(text) - (chars - head):]
+            if chars == 0 or self.count(candidate) <= max_tokens:
+                return candidate
+            chars = chars * 9 // 10
+
+
+_default_counter: TokenCounter | None = None
+
+
+def get_token_counter() -> TokenCounter:
+    """The process-wide TokenCounter, so its cache is shared by all budgets."""
+    global _default_counter
+    if _default_counter is None:
+        _default_counter = TokenCounter()
+    return _default_counter
+
+
+def _to_messages(model_input) -> list[BaseMessage]:
+    if isinstance(model_input, str):
+        return [HumanMessage(content=model_input)]
+    if isinstance(model_input, PromptValue):
+        return model_input.to_messages()
+    return list(convert_to_messages(model_input))
+
+
+class TokenBudget:
+    """A per-call prompt budget and what to do when a prompt exceeds it."""
+
+    def __init__(self, max_prompt_tokens: int, policy: str = "raise", keep_first: int = 0,
+                 counter: TokenCounter | None = None):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown policy {policy!r}, expected one of {POLICIES}")
+        self.max_prompt_tokens = max_prompt_tokens
+        self.policy = policy
+        self.keep_first = keep_first
+        self.counter = counter or get_token_counter()
+
+    def enforce(self, model_input) -> list[BaseMessage]:
+        """Count the prompt and apply the policy; returns the messages to send."""
+        messages = _to_messages(model_input)
+        counts = [self.counter.count_message(m) for m in messages]
+        total = TOKENS_PER_REPLY + sum(counts)
+        logger.debug("pre-flight: %d messages, %d tokens (budget %d)", len(messages), total, self.max_prompt_tokens)
+        if total <= self.max_prompt_tokens:
+            return messages
+
+        if self.policy == "drop_oldest":
+            messages, counts, total = self._drop_oldest(messages, counts, total)
+        elif self.policy == "truncate_middle":
+            messages, total = self._truncate_middle(messages, counts, total)
+
+        if total > self.max_prompt_tokens:
+            raise TokenBudgetExceeded(total, self.max_prompt_tokens)
+        logger.info("pre-flight: prompt trimmed to %d tokens by %s", total, self.policy)
+        return messages
+
+    def _drop_oldest(self, messages, counts, total):
+        droppable = [i for i in range(self.keep_first, len(messages) - 1)
+                     if not isinstance(messages[i], SystemMessage)]
+        dropped = set()
+        for i in droppable:
+            if total <= self.max_prompt_tokens:
+                break
+            dropped.add(i)
+            total -= counts[i]
+        kept = [i for i in range(len(messages)) if i not in dropped]
+        return [messages[i] for i in kept], [counts[i] for i in kept], total
+
+    def _truncate_middle(self, messages, counts, total):
+        messages = list(messages)
+        largest = max(range(len(messages)), key=lambda i: counts[i])
+        message = messages[largest]
+        if not isinstance(message.content, str):
+            return messages, total
+        allowed = counts[largest] - TOKENS_PER_MESSAGE - (total - self.max_prompt_tokens)
+        content = self.counter.truncate_middle(message.content, max(0, allowed))
+        messages[largest] = message.model_copy(update={"content": content})
+        return messages, total - counts[largest] + self.counter.count_message(messages[largest])
+
+
+def with_token_budget(llm, max_prompt_tokens: int, policy: str = "raise", keep_first: int = 0):
+    """Put a pre-flight token budget in front of a chat model (or any Runnable taking messages)."""
+    budget = TokenBudget(max_prompt_tokens, policy, keep_first)
+    return RunnableLambda(budget.enforce, name="token_budget") | llm